@@ -1,19 +1,16 @@
 import os
 import sys
+import queue
 from pathlib import Path
 import logging
+import logging.handlers
 from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import Qt
 
-# Add the project root directory to Python path
-project_root = str(Path(__file__).parent.parent)
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
-
 from src.main_window import MainWindow
 from src.storage.storage import FileStorage
 from src.storage.test_storage import TestSetStorage
-from src.config import config  # Import the config module
+from src.config import config, LOG_LEVELS  # Import the config module
 
 # Define the base directory for prompts and test_sets
 try:
@@ -33,15 +30,20 @@ except Exception as e:
     sys.exit(1)
 
 def setup_logging():
-    """Initialize logging with the configured level and both file and console handlers."""
+    """Initialize logging with the configured level and both file and console handlers.
+
+    Records are queued by the logging call and written by a background listener thread,
+    so logging never blocks the Qt event loop on file or console I/O.
+
+    Returns:
+        The started QueueListener, or None if file logging could not be set up.
+    """
     try:
         # Get the configured logging level
-        level_map = {"Info": logging.INFO, "Warning": logging.WARNING, "Error": logging.ERROR}
-        configured_level = level_map[config.log_level]
+        configured_level = LOG_LEVELS[config.log_level]
         
-        # Set up log file
-        log_file = os.path.join(base_dir, "promptolab.log")
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        # Set up log file (base_dir was created at import time)
+        log_file = base_dir / "promptolab.log"
         
         # Configure root logger
         root_logger = logging.getLogger()
@@ -52,7 +54,9 @@ def setup_logging():
             root_logger.removeHandler(handler)
         
         # Create and configure handlers
-        file_handler = logging.FileHandler(log_file, mode='w')
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=5 * 1024 * 1024, backupCount=3, encoding='utf-8'
+        )
         file_handler.setLevel(configured_level)
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(configured_level)
@@ -62,40 +66,50 @@ def setup_logging():
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
         
-        # Add handlers to root logger
-        root_logger.addHandler(file_handler)
-        root_logger.addHandler(console_handler)
+        # Only the queue handler runs on the caller's thread; the listener does the writing
+        log_queue = queue.SimpleQueue()
+        root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        listener.start()
         
         logger = logging.getLogger(__name__)
         logger.info("Logging initialized successfully with file handler: %s", log_file)
         logger.info("Logging level set to: %s", config.log_level)
+        return listener
         
     except Exception as e:
         # Fallback to basic console logging if file logging setup fails
         logging.basicConfig(
-            level=configured_level,
+            level=LOG_LEVELS.get(config.log_level, logging.WARNING),
             format='%(asctime)s - %(levelname)s - %(message)s',
             force=True
         )
         logger = logging.getLogger(__name__)
         logger.error("Failed to initialize file logging: %s", str(e))
         logger.info("Falling back to console logging only")
+        return None
 
 # Custom PATH configuration because of macOS .app bundle limitations
 def configure_path():
+    """Put the app bundle's directory on PATH so bundled tools (e.g. 'llm') are found.
+
+    Only needed for the macOS app bundle; source runs keep PATH as it is.
+    """
+    if sys.platform != 'darwin' or not getattr(sys, 'frozen', False):
+        return
+
     logger = logging.getLogger(__name__)
     # Get the directory of the current executable
-    if getattr(sys, 'frozen', False):  # Check if app is running in a PyInstaller bundle
-        app_dir = os.path.dirname(sys.executable)
-        logger.info("Application directory (pyinstaller bundle): %s", app_dir)
-    else:
-        app_dir = os.getcwd()
-        logger.info("Application directory (Python script): %s", app_dir)
+    app_dir = os.path.dirname(sys.executable)
+    logger.info("Application directory (pyinstaller bundle): %s", app_dir)
 
-    # Add the MacOS directory to PATH
-    macos_path = os.path.join(app_dir)
+    # Add the MacOS directory to PATH, unless it is already there
     current_path = os.environ.get('PATH', '')
-    updated_path = f"{macos_path}:{current_path}"
+    if app_dir in current_path.split(os.pathsep):
+        return
+    updated_path = f"{app_dir}{os.pathsep}{current_path}"
     logger.info("Updated PATH: %s", updated_path)
     os.environ['PATH'] = updated_path
 
@@ -121,7 +135,7 @@ def setup_storage():
 
 def main():
     """Main entry point of the application."""
-    setup_logging()  # Initialize logging first
+    log_listener = setup_logging()  # Initialize logging first
     configure_path()  # Now configure_path will use the correct logging level
     
     app = QApplication(sys.argv)
@@ -141,18 +155,20 @@ def main():
     # Force cleanup before exiting
     window.cleanup()
     
-    # Ensure all logs are written and cleanup
+    # Write out any queued log records and stop the background writer
+    if log_listener is not None:
+        log_listener.stop()
+
+    # Flush, close and detach each root handler in a single pass over a copy of the list
     root_logger = logging.getLogger()
-    for handler in root_logger.handlers:
-        handler.flush()
-        
-    # Close and remove the file handler
-    for handler in root_logger.handlers:
-        if isinstance(handler, logging.FileHandler):
+    for handler in list(root_logger.handlers):
+        try:
+            handler.flush()
             handler.close()
+        finally:
             root_logger.removeHandler(handler)
             
-    # Final flush of the root logger
+    # Close any remaining handlers (e.g. the listener's file and console handlers)
     logging.shutdown()
     
     sys.exit(exit_code)
@@ -1,39 +1,131 @@
 from PySide6.QtCore import QSettings
 import logging
 
+# Logging level per configured level name
+LOG_LEVELS = {"Info": logging.INFO, "Warning": logging.WARNING, "Error": logging.ERROR}
+
 class Config:
     def __init__(self):
         self.settings = QSettings('PromptoLab', 'PromptoLab')
         self._default_llm_api = "llm-cmd"  # Default value
         self._default_log_level = "Warning"  # Default log level
+        self._default_embed_cache_ttl = 30 * 24 * 3600  # Cached embeddings expire after 30 days
+        self._default_llm_cache_ttl = 7 * 24 * 3600  # Cached completions expire after 7 days
+        self._default_embed_batch_size = 32  # Max texts per coalesced embedding request
+        self._default_llm_concurrency = 4  # Max LLM requests running at once
+        self._default_embed_concurrency = 8  # Max embedding requests running at once
+        self._default_enable_streaming = True  # Stream litellm completions as they are generated
+        # Cached values, so reading a setting doesn't go to the settings backend each time
+        self._llm_api = self.settings.value('llm_api', self._default_llm_api)
+        self._log_level = self.settings.value('log_level', self._default_log_level)
+        self._embed_cache_ttl = self.settings.value('embed_cache_ttl', self._default_embed_cache_ttl, type=int)
+        self._llm_cache_ttl = self.settings.value('llm_cache_ttl', self._default_llm_cache_ttl, type=int)
+        self._embed_batch_size = self.settings.value('embed_batch_size', self._default_embed_batch_size, type=int)
+        self._llm_concurrency = self.settings.value('llm_concurrency', self._default_llm_concurrency, type=int)
+        self._embed_concurrency = self.settings.value('embed_concurrency', self._default_embed_concurrency, type=int)
+        self._enable_streaming = self.settings.value('enable_streaming', self._default_enable_streaming, type=bool)
 
     @property
     def llm_api(self) -> str:
         """Get the configured LLM API."""
-        return self.settings.value('llm_api', self._default_llm_api)
+        return self._llm_api
 
     @llm_api.setter
     def llm_api(self, value: str):
         """Set the LLM API configuration."""
+        self._llm_api = value
         self.settings.setValue('llm_api', value)
         self.settings.sync()  # Ensure settings are written to disk
 
     @property
     def log_level(self) -> str:
         """Get the configured logging level."""
-        return self.settings.value('log_level', self._default_log_level)
+        return self._log_level
 
     @log_level.setter
     def log_level(self, value: str):
         """Set the logging level configuration and update logger."""
+        self._log_level = value
         self.settings.setValue('log_level', value)
         self.settings.sync()
         # Update the actual logging level
-        level_map = {"Info": logging.INFO, "Warning": logging.WARNING, "Error": logging.ERROR}
-        logging.getLogger().setLevel(level_map[value])
+        logging.getLogger().setLevel(LOG_LEVELS[value])
+
+    @property
+    def embed_cache_ttl(self) -> int:
+        """Get the lifetime of cached embeddings in seconds (0 means they never expire)."""
+        return self._embed_cache_ttl
+
+    @embed_cache_ttl.setter
+    def embed_cache_ttl(self, value: int):
+        """Set the lifetime of cached embeddings in seconds."""
+        self._embed_cache_ttl = value
+        self.settings.setValue('embed_cache_ttl', value)
+        self.settings.sync()
+
+    @property
+    def llm_cache_ttl(self) -> int:
+        """Get the lifetime of cached completions in seconds (0 means they never expire)."""
+        return self._llm_cache_ttl
+
+    @llm_cache_ttl.setter
+    def llm_cache_ttl(self, value: int):
+        """Set the lifetime of cached completions in seconds."""
+        self._llm_cache_ttl = value
+        self.settings.setValue('llm_cache_ttl', value)
+        self.settings.sync()
+
+    @property
+    def embed_batch_size(self) -> int:
+        """Get the maximum number of texts sent in one coalesced embedding request."""
+        return self._embed_batch_size
+
+    @embed_batch_size.setter
+    def embed_batch_size(self, value: int):
+        """Set the maximum number of texts sent in one coalesced embedding request."""
+        self._embed_batch_size = value
+        self.settings.setValue('embed_batch_size', value)
+        self.settings.sync()
+
+    @property
+    def llm_concurrency(self) -> int:
+        """Get the maximum number of LLM requests that run at once."""
+        return self._llm_concurrency
+
+    @llm_concurrency.setter
+    def llm_concurrency(self, value: int):
+        """Set the maximum number of LLM requests that run at once."""
+        self._llm_concurrency = value
+        self.settings.setValue('llm_concurrency', value)
+        self.settings.sync()
+
+    @property
+    def embed_concurrency(self) -> int:
+        """Get the maximum number of embedding requests that run at once."""
+        return self._embed_concurrency
+
+    @embed_concurrency.setter
+    def embed_concurrency(self, value: int):
+        """Set the maximum number of embedding requests that run at once."""
+        self._embed_concurrency = value
+        self.settings.setValue('embed_concurrency', value)
+        self.settings.sync()
+
+    @property
+    def enable_streaming(self) -> bool:
+        """Get whether LLM responses are streamed to the UI as they are generated."""
+        return self._enable_streaming
+
+    @enable_streaming.setter
+    def enable_streaming(self, value: bool):
+        """Set whether LLM responses are streamed to the UI as they are generated."""
+        self._enable_streaming = value
+        self.settings.setValue('enable_streaming', value)
+        self.settings.sync()
 
     def reset_llm_api(self):
         """Reset LLM API to default value."""
+        self._llm_api = self._default_llm_api
         self.settings.remove('llm_api')
         self.settings.sync()
 
@@ -43,5 +135,13 @@ class Config:
         self.settings.sync()
         self.log_level = self._default_log_level
 
+    def reset_concurrency(self):
+        """Reset the LLM and embedding concurrency limits to their default values."""
+        self._llm_concurrency = self._default_llm_concurrency
+        self._embed_concurrency = self._default_embed_concurrency
+        self.settings.remove('llm_concurrency')
+        self.settings.remove('embed_concurrency')
+        self.settings.sync()
+
 # Global config instance
 config = Config()
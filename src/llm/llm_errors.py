@@ -0,0 +1,24 @@
+# llm_errors.py
+"""
+Exception types shared by the LLM backends.
+
+They live in their own module so that callers can catch them without importing
+a backend (and its heavy dependencies) just for the exception classes.
+"""
+
+
+class LLMError(Exception):
+    """Base class for LLM-related errors."""
+    pass
+
+class LLMQuotaError(LLMError):
+    """Raised when the LLM API quota is exhausted."""
+    pass
+
+class LLMCapabilityError(LLMError):
+    """Raised when the model doesn't support requested features."""
+    pass
+
+class LLMConnectionError(LLMError):
+    """Raised when there are connection/network issues."""
+    pass
@@ -1,52 +1,244 @@
 # QtModelWorkers.py
-import sys
-import traceback
-import json
 import logging
+import time
+import threading
+import importlib
+from concurrent.futures import Future
+from types import ModuleType, MappingProxyType
 from PySide6.QtCore import Signal, Slot, QObject, Qt, QRunnable
-from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, List, Mapping, Tuple, TYPE_CHECKING
 
-logging.debug('llm_utils_adapter module imported.')
+logger = logging.getLogger(__name__)
+logger.debug('llm_utils_adapter module imported.')
 
-# Add the project root directory to Python path
-project_root = str(Path(__file__).parent.parent.parent)
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
-
-from src.llm import llm_utils_litellm
-from src.llm import llm_utils_llmcmd
+from src.llm.llm_errors import LLMQuotaError, LLMCapabilityError, LLMConnectionError
+from src.llm.response_cache import response_cache, make_key
 from src.config import config
 from src.utils.thread_manager import BaseRunnable, ThreadManager
 
+# Shared read-only default for workers created without model parameters
+_EMPTY_PARAMS: Mapping[str, Any] = MappingProxyType({})
+
+# Backend module per LLM API. Backends are imported on first use, so the one that
+# isn't configured (and e.g. litellm's dependency tree) is never loaded.
+_BACKEND_MODULES = {
+    "llm-cmd": "src.llm.llm_utils_llmcmd",
+    "litellm": "src.llm.llm_utils_litellm",
+}
+_backends: Dict[str, ModuleType] = {}
+
+def _get_backend(api: str) -> ModuleType:
+    """Return the backend module for the given LLM API, importing it on first use."""
+    backend = _backends.get(api)
+    if backend is None:
+        if api not in _BACKEND_MODULES:
+            raise ValueError(f"Unsupported LLM API: {api}")
+        backend = _backends[api] = importlib.import_module(_BACKEND_MODULES[api])
+    return backend
+
+# numpy is imported in the worker threads on first use, keeping it off the startup path
+if TYPE_CHECKING:
+    import numpy as np
+
+def _to_embedding(values) -> "np.ndarray":
+    """Convert an embedding returned by a backend into a 1-D float32 array."""
+    import numpy as np
+    return np.asarray(values, dtype=np.float32)
+
+def _embed_cache_key(embed_model: str, text: str) -> str:
+    """Cache key for an embedding; texts that differ only in whitespace share an entry."""
+    return make_key(kind="embed", api=config.llm_api, model=embed_model, text=" ".join(text.split()))
+
+def _embed_cache_max_age() -> Optional[float]:
+    """Return the configured embedding cache lifetime in seconds, or None if entries never expire."""
+    ttl = config.embed_cache_ttl
+    return ttl if ttl > 0 else None
+
+def _llm_cache_max_age() -> Optional[float]:
+    """Return the configured completion cache lifetime in seconds, or None if entries never expire."""
+    ttl = config.llm_cache_ttl
+    return ttl if ttl > 0 else None
+
+# Requests currently being computed, keyed by their cache key. Identical requests
+# that arrive meanwhile wait for the same result instead of calling the backend again.
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+def _single_flight(key: str, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+    """
+    Return compute()'s result, sharing one call among concurrent requests with the same key.
+    
+    Returns a (result, shared) tuple; shared is True if the result came from another request's call.
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight[key] = Future()
+    if not owner:
+        return future.result(), True
+    try:
+        result = compute()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result, False
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+
+class EmbedBatcher:
+    """
+    Coalesces embedding requests from concurrent runnables into batch requests.
+    
+    Texts submitted for the same API and model within FLUSH_DELAY seconds of each other,
+    up to config.embed_batch_size of them, are embedded with one run_embed_batch() call.
+    """
+    FLUSH_DELAY = 0.02
+    _instance = None
+    _instance_lock = threading.Lock()
+    
+    @classmethod
+    def instance(cls) -> "EmbedBatcher":
+        """Get the singleton instance of the EmbedBatcher."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = EmbedBatcher()
+            return cls._instance
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], List[Tuple[str, Future]]] = {}
+        self._timers: Dict[Tuple[str, str], threading.Timer] = {}
+    
+    def submit(self, embed_model: str, text: str) -> Future:
+        """Queue a text for embedding; the future resolves to the backend's embedding."""
+        key = (config.llm_api, embed_model)
+        future = Future()
+        with self._lock:
+            batch = self._pending.setdefault(key, [])
+            batch.append((text, future))
+            ready = self._take(key) if len(batch) >= config.embed_batch_size else None
+            if ready is None and key not in self._timers:
+                timer = threading.Timer(self.FLUSH_DELAY, self._flush, args=(key,))
+                timer.daemon = True
+                self._timers[key] = timer
+                timer.start()
+        if ready:
+            self._run_batch(key, ready)
+        return future
+    
+    def _take(self, key: Tuple[str, str]) -> List[Tuple[str, Future]]:
+        """Remove and return the pending batch for key. Must be called with the lock held."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        return self._pending.pop(key, [])
+    
+    def _flush(self, key: Tuple[str, str]):
+        with self._lock:
+            batch = self._take(key)
+        if batch:
+            self._run_batch(key, batch)
+    
+    def _run_batch(self, key: Tuple[str, str], batch: List[Tuple[str, Future]]):
+        api, embed_model = key
+        try:
+            results = _get_backend(api).run_embed_batch(embed_model, [text for text, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Expected {len(batch)} embeddings, got {len(results)}")
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+# Model lists per LLM API with the monotonic time they were fetched
+_MODELS_CACHE_TTL = 300.0
+_models_cache: Dict[str, Tuple[float, Tuple[str, ...]]] = {}
+# Held while fetching, so a prefetch and a UI request don't both run 'llm models'
+_models_lock = threading.Lock()
+
+def _cached_models(api: str) -> Optional[Tuple[str, ...]]:
+    cached = _models_cache.get(api)
+    if cached is not None and time.monotonic() - cached[0] < _MODELS_CACHE_TTL:
+        return cached[1]
+    return None
+
+class _WarmUpRunnable(BaseRunnable):
+    """Runnable that loads the configured backend and fills the model list cache in the background."""
+    
+    def run(self):
+        try:
+            _get_backend(config.llm_api).warm_up()
+            LLMWorker.get_models()
+            self.signals.finished.emit(None)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
 # Legacy QObject-based worker for backward compatibility
 class LLMWorker(QObject):
-    """Worker that runs llm_utils_xxx.run_llm depending on the configured LLM API."""
+    """Worker that runs llm_utils_xxx.run_llm depending on the configured LLM API.
+    
+    Temperature 0 requests are answered from and stored in the on-disk response
+    cache unless no_cache is set. cache_key replaces the default key, for callers
+    that treat more requests as identical (e.g. ignoring whitespace differences).
+    """
     finished = Signal(str)
+    partial = Signal(str)  # Chunks of the response while it is streamed
     error = Signal(str)
     cancelled = Signal()
     
-    def __init__(self, model_name: str, user_prompt: str, system_prompt: Optional[str] = None, model_params: Optional[Dict[str, Any]] = None):
+    def __init__(self, model_name: str, user_prompt: str, system_prompt: Optional[str] = None, model_params: Optional[Dict[str, Any]] = None,
+                 cache_key: Optional[str] = None, no_cache: bool = False):
         super().__init__()
         self.model_name = model_name
         self.user_prompt = user_prompt
         self.system_prompt = system_prompt
-        self.model_params = model_params or {}
+        self.model_params = model_params if model_params else _EMPTY_PARAMS
+        self.cache_key = cache_key
+        self.no_cache = no_cache
         self._runnable = None
 
     @staticmethod
-    def get_models() -> list[str]:
-        """Return a list of available models for the configured LLM API.
+    def get_models() -> Tuple[str, ...]:
+        """Return the available models for the configured LLM API.
+        
+        The list is cached per API for a short time, since fetching it may run
+        a subprocess and several widgets ask for it when they are populated.
         
         Returns:
-            A list of model names supported by the configured API.
+            A tuple of model names supported by the configured API. The tuple
+            is shared between callers, which is safe since it can't be modified.
         """
-        if config.llm_api == "llm-cmd":
-            return llm_utils_llmcmd.get_models()
-        elif config.llm_api == "litellm":
-            return llm_utils_litellm.get_models()
-        else:
-            raise ValueError(f"Unsupported LLM API: {config.llm_api}")
+        api = config.llm_api
+        models = _cached_models(api)
+        if models is not None:
+            return models
+        with _models_lock:
+            models = _cached_models(api)
+            if models is None:
+                models = _get_backend(api).get_models()
+                models = tuple(models)
+                _models_cache[api] = (time.monotonic(), models)
+        return models
+
+    @staticmethod
+    def warm_up() -> None:
+        """Load the configured backend and fetch its model list in the thread pool.
+        
+        Later get_models() calls then find the list cached, and the first request
+        doesn't pay for importing the backend's libraries.
+        """
+        ThreadManager.instance().start_runnable(_WarmUpRunnable())
+
+    @staticmethod
+    def invalidate_models_cache() -> None:
+        """Drop cached model lists so the next get_models() call fetches them again."""
+        _models_cache.clear()
 
     @Slot()
     def run(self):
@@ -56,16 +248,19 @@ class LLMWorker(QObject):
             model_name=self.model_name,
             user_prompt=self.user_prompt,
             system_prompt=self.system_prompt,
-            model_params=self.model_params
+            model_params=self.model_params,
+            cache_key=self.cache_key,
+            no_cache=self.no_cache
         )
         
         # Connect signals
         self._runnable.signals.finished.connect(self.finished.emit)
+        self._runnable.signals.partial.connect(self.partial.emit)
         self._runnable.signals.error.connect(self.error.emit)
         self._runnable.signals.cancelled.connect(self.cancelled.emit)
         
         # Start the runnable in the thread pool
-        ThreadManager.instance().start_runnable(self._runnable)
+        ThreadManager.instance().start_runnable(self._runnable, kind='llm')
 
     def cancel(self):
         """Request cancellation of the running task."""
@@ -76,12 +271,15 @@ class LLMWorker(QObject):
 class LLMRunnable(BaseRunnable):
     """Runnable that executes LLM requests in a thread pool."""
     
-    def __init__(self, model_name: str, user_prompt: str, system_prompt: Optional[str] = None, model_params: Optional[Dict[str, Any]] = None):
+    def __init__(self, model_name: str, user_prompt: str, system_prompt: Optional[str] = None, model_params: Optional[Dict[str, Any]] = None,
+                 cache_key: Optional[str] = None, no_cache: bool = False):
         super().__init__()
         self.model_name = model_name
         self.user_prompt = user_prompt
         self.system_prompt = system_prompt
-        self.model_params = model_params or {}
+        self.model_params = model_params if model_params else _EMPTY_PARAMS
+        self.cache_key = cache_key
+        self.no_cache = no_cache
     
     def run(self):
         """Executed in the worker thread."""
@@ -91,21 +289,30 @@ class LLMRunnable(BaseRunnable):
                 self.signals.cancelled.emit()
                 return
                 
-            # Run the LLM request
-            if config.llm_api == 'llm-cmd':
-                result = llm_utils_llmcmd.run_llm(
-                    self.model_name,
-                    self.user_prompt,
-                    self.system_prompt,
-                    self.model_params
-                )
+            # Only deterministic (temperature 0) requests can be answered from the cache
+            cache_key = None
+            if not self.no_cache and self.model_params.get("temperature") == 0:
+                cache_key = self.cache_key or make_key(kind="llm", api=config.llm_api, model=self.model_name,
+                                                       system_prompt=self.system_prompt, user_prompt=self.user_prompt,
+                                                       model_params=dict(self.model_params))
+                # Entries expire, so that a changed model behind the same name is asked again
+                cached = response_cache.get(cache_key, _llm_cache_max_age())
+                if cached is not None:
+                    self.signals.finished.emit(cached)
+                    return
+
+            if cache_key is None:
+                result = self._run_backend(cache_key)
             else:
-                result = llm_utils_litellm.run_llm(
-                    self.model_name,
-                    self.user_prompt,
-                    self.system_prompt,
-                    self.model_params
-                )
+                # Wait for an identical request that is already running. If that one
+                # gets cancelled, run the request ourselves.
+                while True:
+                    result, shared = _single_flight(cache_key, lambda: self._run_backend(cache_key))
+                    if result is not None or not shared:
+                        break
+            if result is None:
+                self.signals.cancelled.emit()
+                return
                 
             # Check if cancelled before emitting result
             if self.is_cancelled():
@@ -114,27 +321,122 @@ class LLMRunnable(BaseRunnable):
                 
             self.signals.finished.emit(result)
 
-        except (llm_utils_llmcmd.LLMQuotaError,
-                llm_utils_llmcmd.LLMCapabilityError,
-                llm_utils_llmcmd.LLMConnectionError) as e:
+        except (LLMQuotaError, LLMCapabilityError, LLMConnectionError) as e:
             # Pass through the user-friendly error messages
             if not self.is_cancelled():
                 self.signals.error.emit(str(e))
 
         except Exception as e:
             if not self.is_cancelled():
-                tb_str = traceback.format_exc()
-                self.signals.error.emit(f"{e}\n{tb_str}")
+                # The traceback goes to the log; the UI only shows the message
+                logger.exception("%s failed", type(self).__name__)
+                self.signals.error.emit(f"{type(e).__name__}: {e}")
+
+    def _run_backend(self, cache_key: Optional[str]) -> Optional[str]:
+        """Run the request on the configured backend; returns None if a streamed request was cancelled."""
+        # litellm responses are streamed chunk by chunk, which also lets a cancel
+        # request stop the request between chunks.
+        backend = _get_backend(config.llm_api)
+        if config.enable_streaming and config.llm_api == 'litellm':
+            result = backend.run_llm_stream(
+                self.model_name,
+                self.user_prompt,
+                self.system_prompt,
+                self.model_params,
+                on_chunk=self.signals.partial.emit,
+                is_cancelled=self.is_cancelled
+            )
+        else:
+            result = backend.run_llm(
+                self.model_name,
+                self.user_prompt,
+                self.system_prompt,
+                self.model_params
+            )
+        if cache_key is not None and result is not None:
+            response_cache.put(cache_key, result)
+        return result
 
 # QRunnable implementation for embedding tasks
 class EmbedRunnable(BaseRunnable):
-    """Runnable that executes embedding requests in a thread pool."""
+    """Runnable that executes embedding requests in a thread pool.
+    
+    Embeddings are read from and written to the on-disk cache unless no_cache is set,
+    e.g. for texts that should not be stored.
+    """
     
-    def __init__(self, text: str, llm_cmd_embed_model: str = "3-large", litellm_embed_model: str = "text-embedding-3-large"):
+    def __init__(self, text: str, llm_cmd_embed_model: str = "3-large", litellm_embed_model: str = "text-embedding-3-large",
+                 no_cache: bool = False):
         super().__init__()
         self.text = text
         self.llm_cmd_embed_model = llm_cmd_embed_model
         self.litellm_embed_model = litellm_embed_model
+        self.no_cache = no_cache
+    
+    def run(self):
+        """Executed in the worker thread."""
+        try:
+            # Check if cancelled before starting
+            if self.is_cancelled():
+                self.signals.cancelled.emit()
+                return
+                
+            # Embeddings are pure functions of model and text, so they are always cacheable
+            if config.llm_api == 'llm-cmd':
+                embed_model = self.llm_cmd_embed_model
+            else:
+                embed_model = self.litellm_embed_model
+            cache_key = _embed_cache_key(embed_model, self.text)
+            embedding = None
+            if not self.no_cache:
+                embedding = response_cache.get_vector(cache_key, _embed_cache_max_age())
+
+            if embedding is None:
+                # Concurrent misses for the same text share one backend request
+                embedding, _ = _single_flight(cache_key, lambda: self._embed(embed_model, cache_key))
+                
+            # Check if cancelled before emitting result
+            if self.is_cancelled():
+                self.signals.cancelled.emit()
+                return
+                
+            self.signals.finished.emit(embedding)
+
+        except (LLMQuotaError, LLMCapabilityError, LLMConnectionError) as e:
+            # Pass through the user-friendly error messages
+            if not self.is_cancelled():
+                self.signals.error.emit(str(e))
+
+        except Exception as e:
+            if not self.is_cancelled():
+                # The traceback goes to the log; the UI only shows the message
+                logger.exception("%s failed", type(self).__name__)
+                self.signals.error.emit(f"{type(e).__name__}: {e}")
+
+    def _embed(self, embed_model: str, cache_key: str) -> "np.ndarray":
+        """Embed the text on the configured backend and store it in the cache."""
+        # litellm requests are coalesced with those of other runnables; the llm CLI
+        # embeds one text per call, so it gains nothing.
+        if config.llm_api == 'litellm':
+            result = EmbedBatcher.instance().submit(embed_model, self.text).result()
+        else:
+            result = _get_backend(config.llm_api).run_embed(embed_model, self.text)
+        embedding = _to_embedding(result)
+        if not self.no_cache:
+            response_cache.put_vector(cache_key, embedding)
+        return embedding
+
+# QRunnable implementation for batched embedding tasks
+class EmbedBatchRunnable(BaseRunnable):
+    """Runnable that embeds several texts with as few backend requests as possible."""
+    
+    def __init__(self, texts: List[str], llm_cmd_embed_model: str = "3-large", litellm_embed_model: str = "text-embedding-3-large",
+                 no_cache: bool = False):
+        super().__init__()
+        self.texts = list(texts)
+        self.llm_cmd_embed_model = llm_cmd_embed_model
+        self.litellm_embed_model = litellm_embed_model
+        self.no_cache = no_cache
     
     def run(self):
         """Executed in the worker thread."""
@@ -144,45 +446,60 @@ class EmbedRunnable(BaseRunnable):
                 self.signals.cancelled.emit()
                 return
                 
-            # Run the embed model request
             if config.llm_api == 'llm-cmd':
-                result = llm_utils_llmcmd.run_embed(self.llm_cmd_embed_model, self.text)
+                embed_model = self.llm_cmd_embed_model
+            else:
+                embed_model = self.litellm_embed_model
+            if self.no_cache:
+                cache_keys = None
+                embeddings = [None] * len(self.texts)
             else:
-                result = llm_utils_litellm.run_embed(self.litellm_embed_model, self.text)
+                max_age = _embed_cache_max_age()
+                cache_keys = [_embed_cache_key(embed_model, text) for text in self.texts]
+                embeddings = [response_cache.get_vector(key, max_age) for key in cache_keys]
+
+            # Embed all cache misses with a single batch request
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            if missing:
+                results = _get_backend(config.llm_api).run_embed_batch(
+                    embed_model, [self.texts[i] for i in missing]
+                )
+                for i, result in zip(missing, results):
+                    embeddings[i] = _to_embedding(result)
+                    if cache_keys is not None:
+                        response_cache.put_vector(cache_keys[i], embeddings[i])
                 
             # Check if cancelled before emitting result
             if self.is_cancelled():
                 self.signals.cancelled.emit()
                 return
                 
-            # Convert List[float] to JSON string before emitting
-            json_result = json.dumps(result)
-            self.signals.finished.emit(json_result)
+            self.signals.finished.emit(embeddings)
 
-        except (llm_utils_llmcmd.LLMQuotaError,
-                llm_utils_llmcmd.LLMCapabilityError,
-                llm_utils_llmcmd.LLMConnectionError) as e:
+        except (LLMQuotaError, LLMCapabilityError, LLMConnectionError) as e:
             # Pass through the user-friendly error messages
             if not self.is_cancelled():
                 self.signals.error.emit(str(e))
 
         except Exception as e:
             if not self.is_cancelled():
-                tb_str = traceback.format_exc()
-                self.signals.error.emit(f"{e}\n{tb_str}")
+                # The traceback goes to the log; the UI only shows the message
+                logger.exception("%s failed", type(self).__name__)
+                self.signals.error.emit(f"{type(e).__name__}: {e}")
 
 # Legacy QObject-based worker for backward compatibility
 class EmbedWorker(QObject):
     """Worker that runs llm_utils_xxx.run_embed depending on the configured LLM API."""
-    finished = Signal(str)
+    finished = Signal(object)  # 1-D float32 numpy array
     error = Signal(str)
     cancelled = Signal()
     
-    def __init__(self, text: str):
+    def __init__(self, text: str, no_cache: bool = False):
         super().__init__()
         self.llm_cmd_embed_model = "3-large"
         self.litellm_embed_model = "text-embedding-3-large"
         self.text = text
+        self.no_cache = no_cache
         self._runnable = None
         
     @Slot()
@@ -192,7 +509,45 @@ class EmbedWorker(QObject):
         self._runnable = EmbedRunnable(
             text=self.text,
             llm_cmd_embed_model=self.llm_cmd_embed_model,
-            litellm_embed_model=self.litellm_embed_model
+            litellm_embed_model=self.litellm_embed_model,
+            no_cache=self.no_cache
+        )
+        
+        # Connect signals
+        self._runnable.signals.finished.connect(self.finished.emit)
+        self._runnable.signals.error.connect(self.error.emit)
+        self._runnable.signals.cancelled.connect(self.cancelled.emit)
+        
+        # Start the runnable in the thread pool
+        ThreadManager.instance().start_runnable(self._runnable, kind='embed')
+
+    def cancel(self):
+        """Request cancellation of the running task."""
+        if self._runnable:
+            self._runnable.cancel()
+
+class BatchEmbedWorker(QObject):
+    """Worker that embeds several texts at once; finished carries one float32 array per text, in order."""
+    finished = Signal(list)
+    error = Signal(str)
+    cancelled = Signal()
+    
+    def __init__(self, texts: List[str], no_cache: bool = False):
+        super().__init__()
+        self.llm_cmd_embed_model = "3-large"
+        self.litellm_embed_model = "text-embedding-3-large"
+        self.texts = list(texts)
+        self.no_cache = no_cache
+        self._runnable = None
+        
+    @Slot()
+    def run(self):
+        """Start the batch embedding task in a thread pool."""
+        self._runnable = EmbedBatchRunnable(
+            texts=self.texts,
+            llm_cmd_embed_model=self.llm_cmd_embed_model,
+            litellm_embed_model=self.litellm_embed_model,
+            no_cache=self.no_cache
         )
         
         # Connect signals
@@ -201,7 +556,7 @@ class EmbedWorker(QObject):
         self._runnable.signals.cancelled.connect(self.cancelled.emit)
         
         # Start the runnable in the thread pool
-        ThreadManager.instance().start_runnable(self._runnable)
+        ThreadManager.instance().start_runnable(self._runnable, kind='embed')
 
     def cancel(self):
         """Request cancellation of the running task."""
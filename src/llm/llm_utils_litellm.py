@@ -10,13 +10,27 @@ Public methods:
 
 2. run_embed(embed_model: str, text: str) -> List[float]
 
-3. get_models() -> List[str]
+3. run_embed_batch(embed_model: str, texts: List[str]) -> List[List[float]]
+
+4. get_models() -> Tuple[str, ...]
+
+5. warm_up() -> None
+
+6. run_llm_stream(model_name: str, user_prompt: str,
+   system_prompt: Optional[str] = None,
+   model_params: Optional[Dict[str, Any]] = None,
+   on_chunk: Optional[Callable[[str], None]] = None,
+   is_cancelled: Optional[Callable[[], bool]] = None) -> Optional[str]
+
+7. is_supported(model_name: str) -> bool
 """
 
+import atexit
 import logging
 import os
-from typing import Optional, List, Dict, Any
-import litellm
+import threading
+from types import ModuleType
+from typing import Optional, List, Dict, Any, Callable, Tuple
 
 # Configure logging based on config
 level_map = {"Info": "DEBUG", "Warning": "WARNING", "Error": "ERROR"}
@@ -26,8 +40,40 @@ os.environ['LITELLM_LOG'] = level_map.get(os.environ.get('LITELLM_LOG_LEVEL', 'W
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# litellm takes a second or more to import, so it is loaded on first use rather than at startup
+_litellm_module: Optional[ModuleType] = None
+_litellm_lock = threading.Lock()
+
+# Keep-alive connections shared by all requests, so repeated calls to the same
+# provider reuse the TLS session instead of opening a new connection each time
+_HTTP_MAX_KEEPALIVE = 32
+_HTTP_TIMEOUT = 60.0
+
+def _create_http_client():
+    """Create the shared HTTP client. It speaks HTTP/2 (via httpx[http2], see requirements.txt)."""
+    import httpx
+    client = httpx.Client(
+        http2=True,
+        timeout=_HTTP_TIMEOUT,
+        limits=httpx.Limits(max_keepalive_connections=_HTTP_MAX_KEEPALIVE),
+    )
+    atexit.register(client.close)
+    return client
+
+def _litellm() -> ModuleType:
+    """Return the litellm module, importing it and installing the shared HTTP client on first use."""
+    global _litellm_module
+    if _litellm_module is None:
+        with _litellm_lock:
+            if _litellm_module is None:
+                import litellm
+                if litellm.client_session is None:
+                    litellm.client_session = _create_http_client()
+                _litellm_module = litellm
+    return _litellm_module
+
 # You can customize or dynamically generate the supported models below.
-SUPPORTED_MODELS = [
+SUPPORTED_MODELS: Tuple[str, ...] = (
     # OpenAI Models
     "gpt-5.5",
     "gpt-5.4",
@@ -57,7 +103,33 @@ SUPPORTED_MODELS = [
     "ollama/phi4",
     
     # ... add or remove models as needed
-]
+)
+SUPPORTED_MODELS_SET = frozenset(SUPPORTED_MODELS)
+
+
+def _supports_prompt_caching(model_name: str) -> bool:
+    """
+    Return True if the model needs an explicit cache_control marker for prompt caching.
+
+    Anthropic (Claude) models only reuse a cached prompt prefix when it is marked;
+    OpenAI models cache long prefixes automatically and need no marker.
+    """
+    return "claude" in model_name.lower()
+
+
+def _build_messages(model_name: str, user_prompt: str, system_prompt: Optional[str]) -> List[Dict[str, Any]]:
+    """Build the chat messages for a completion request."""
+    messages = []
+    if system_prompt is not None:
+        if _supports_prompt_caching(model_name):
+            # Mark the static system prompt as a cacheable prefix
+            messages.append({"role": "system", "content": [
+                {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+            ]})
+        else:
+            messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": user_prompt})
+    return messages
 
 
 def run_llm(
@@ -80,10 +152,7 @@ def run_llm(
     :return: The generated text from the model.
     :raises ValueError: If the LiteLLM response format is not recognized.
     """
-    messages = []
-    if system_prompt is not None:
-        messages.append({"role": "system", "content": system_prompt})
-    messages.append({"role": "user", "content": user_prompt})
+    messages = _build_messages(model_name, user_prompt, system_prompt)
 
     if model_params is None:
         model_params = {}
@@ -96,7 +165,7 @@ def run_llm(
     if model_params:
         logger.info("Model parameters: %s", model_params)
 
-    result = litellm.completion(
+    result = _litellm().completion(
         model=model_name,
         messages=messages,
         **model_params
@@ -105,13 +174,64 @@ def run_llm(
     # Extract the actual response text from the OpenAI completion result
     if hasattr(result, 'choices') and len(result.choices) > 0:
         response = result.choices[0].message.content
-        logger.info("LLM response: %s", (response[:80] + "...") if response else "None")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("LLM response: %s", (response[:80] + "...") if response else "None")
         return response
     else:
         logger.error("Unexpected response format from LiteLLM: %s", result)
         raise ValueError("Unexpected response format from LiteLLM")
 
 
+def run_llm_stream(
+    model_name: str,
+    user_prompt: str,
+    system_prompt: Optional[str] = None,
+    model_params: Optional[Dict[str, Any]] = None,
+    on_chunk: Optional[Callable[[str], None]] = None,
+    is_cancelled: Optional[Callable[[], bool]] = None,
+) -> Optional[str]:
+    """
+    Run a streaming completion call, passing each chunk of text to on_chunk as it arrives.
+
+    :param model_name: The name of the model to use (e.g. 'gpt-4o-mini').
+    :param user_prompt: The user prompt text.
+    :param system_prompt: (Optional) A system prompt / context to guide the model.
+    :param model_params: (Optional) Dictionary of additional model parameters, if any.
+    :param on_chunk: (Optional) Called with each non-empty chunk of generated text.
+    :param is_cancelled: (Optional) Checked between chunks; returning True stops the stream.
+    :return: The complete generated text, or None if the stream was cancelled.
+    """
+    messages = _build_messages(model_name, user_prompt, system_prompt)
+
+    if model_params is None:
+        model_params = {}
+
+    logger.info("Running streaming LiteLLM completion with model: %s", model_name)
+
+    stream = _litellm().completion(
+        model=model_name,
+        messages=messages,
+        stream=True,
+        **model_params
+    )
+
+    parts = []
+    for chunk in stream:
+        if is_cancelled is not None and is_cancelled():
+            logger.info("Streaming completion cancelled after %d chunks", len(parts))
+            return None
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            parts.append(delta)
+            if on_chunk is not None:
+                on_chunk(delta)
+
+    response = "".join(parts)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("LLM response: %s", (response[:80] + "...") if response else "None")
+    return response
+
+
 def run_embed(embed_model: str, text: str) -> List[float]:
     """
     Get an embedding vector for the given text using the specified embed model.
@@ -122,26 +242,61 @@ def run_embed(embed_model: str, text: str) -> List[float]:
     :raises ValueError: If the LiteLLM response format is not recognized.
     """
     # Log the request details
-    logger.info("Running LiteLLM embedding with model: %s", embed_model)
-    logger.info("Text to embed: %s", (text[:70] + "...") if text else "None")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Running LiteLLM embedding with model: %s", embed_model)
+        logger.info("Text to embed: %s", (text[:70] + "...") if text else "None")
 
-    result = litellm.embedding(model=embed_model, input=text)
+    result = _litellm().embedding(model=embed_model, input=text)
 
     # Extract the embedding result (assuming it's an OpenAI EmbeddingResponse object)
     if hasattr(result, 'data') and len(result.data) > 0:
         embedding_vector = result.data[0]['embedding']
-        logger.info(f"Embedding result: {embedding_vector[:2]} ... {embedding_vector[-2:]}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Embedding result: %s ... %s", embedding_vector[:2], embedding_vector[-2:])
         return embedding_vector
     else:
         logger.error("Unexpected embedding response format from LiteLLM: %s", result)
         raise ValueError("Unexpected embedding response format from LiteLLM")
 
 
-def get_models() -> List[str]:
+def run_embed_batch(embed_model: str, texts: List[str]) -> List[List[float]]:
+    """
+    Get embedding vectors for several texts with a single embedding request.
+
+    :param embed_model: The name of the embedding model (e.g. 'text-embedding-ada-002').
+    :param texts: The texts to be embedded.
+    :return: One embedding vector per text, in the order of the texts.
+    :raises ValueError: If the LiteLLM response format is not recognized.
+    """
+    logger.info("Running LiteLLM batch embedding with model: %s (%d texts)", embed_model, len(texts))
+
+    result = _litellm().embedding(model=embed_model, input=list(texts))
+
+    if hasattr(result, 'data') and len(result.data) == len(texts):
+        return [item['embedding'] for item in result.data]
+    else:
+        logger.error("Unexpected embedding response format from LiteLLM: %s", result)
+        raise ValueError("Unexpected embedding response format from LiteLLM")
+
+
+def get_models() -> Tuple[str, ...]:
     """
-    Return a list of models supported by this module.
+    Return the models supported by this module.
 
-    :return: A list of model names.
+    :return: A tuple of model names, shared by all callers.
+    """
+    return SUPPORTED_MODELS
+
+
+def is_supported(model_name: str) -> bool:
+    """
+    Return True if model_name is one of the supported models.
+    """
+    return model_name in SUPPORTED_MODELS_SET
+
+
+def warm_up() -> None:
+    """
+    Import litellm ahead of the first request, e.g. from a background thread at startup.
     """
-    logger.info("Returning supported LiteLLM models")
-    return SUPPORTED_MODELS
\ No newline at end of file
+    _litellm()
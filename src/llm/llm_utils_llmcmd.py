@@ -1,6 +1,8 @@
 """
 A module that provides methods for usage with the llm command line tool.
 Requires Python 3.10 or above and the 'llm' command line tool installed.
+If the 'llm' package is importable in this environment, completions and
+embeddings run in-process instead of spawning the command line tool for each request.
 
 Public methods:
 1. run_llm(model_name: str, user_prompt: str, 
@@ -9,55 +11,116 @@ Public methods:
 
 2. run_embed(embed_model: str, text: str) -> List[float]
 
-3. get_models() -> List[str]
+3. run_embed_batch(embed_model: str, texts: List[str]) -> List[List[float]]
+
+4. get_models() -> Tuple[str, ...]
+
+5. warm_up() -> None
 """
 
 import json
 import logging
+import functools
+import re
 import subprocess
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+
+# Re-exported so existing `llm_utils_llmcmd.LLMQuotaError` references keep working
+from src.llm.llm_errors import LLMError, LLMQuotaError, LLMCapabilityError, LLMConnectionError
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Default models, if the command "llm models" fails to run successfully.
-DEFAULT_MODELS = [
-    "Undefined",
-]
+# The llm package is optional; it is often installed only as a command line tool (e.g. via pipx)
+try:
+    import llm as llm_lib
+except ImportError:
+    llm_lib = None
 
-class LLMError(Exception):
-    """Base class for LLM-related errors."""
-    pass
+# orjson parses the long float arrays printed by 'llm embed' much faster, if installed.
+# Its JSONDecodeError subclasses json.JSONDecodeError.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
-class LLMQuotaError(LLMError):
-    """Raised when the LLM API quota is exhausted."""
-    pass
+# Models and embedding models resolved through the llm package, by name
+_llm_models: Dict[str, Any] = {}
+_embed_models: Dict[str, Any] = {}
 
-class LLMCapabilityError(LLMError):
-    """Raised when the model doesn't support requested features."""
-    pass
+def _get_embed_model(embed_model: str) -> Any:
+    model = _embed_models.get(embed_model)
+    if model is None:
+        model = _embed_models[embed_model] = llm_lib.get_embedding_model(embed_model)
+    return model
 
-class LLMConnectionError(LLMError):
-    """Raised when there are connection/network issues."""
-    pass
+# Default models, if the command "llm models" fails to run successfully.
+DEFAULT_MODELS = (
+    "Undefined",
+)
 
-def _build_llm_command(model: str, system_prompt: Optional[str] = None,
-                    model_params: Optional[Dict[str, Any]] = None) -> list[str]:
-    """Build the LLM command with all necessary parameters."""
+@functools.lru_cache(maxsize=256)
+def _build_llm_command_cached(model: str, system_prompt: Optional[str],
+                              options: Tuple[Tuple[str, str], ...]) -> Tuple[str, ...]:
     cmd = ["llm", "-m", model]
     
-    if model_params:
-        for key, value in model_params.items():
-            if value is not None:
-                cmd.extend(["-o", key, str(value)])
+    for key, value in options:
+        cmd.extend(["-o", key, value])
         
     if system_prompt is not None:
-        # Escape any single quotes in the system prompt
-        escaped_system_prompt = system_prompt.replace("'", "'\"'\"'")
-        cmd.extend(["-s", "'" + escaped_system_prompt + "'"])
+        # Arguments go to the process as-is (no shell), so the prompt needs no quoting
+        cmd.extend(["-s", system_prompt])
         
-    return cmd
+    return tuple(cmd)
+
+def _build_llm_command(model: str, system_prompt: Optional[str] = None,
+                    model_params: Optional[Dict[str, Any]] = None) -> list[str]:
+    """Build the LLM command with all necessary parameters.
+    
+    Commands are cached, since evaluations run the same model, system prompt and
+    parameters for many user prompts (which are passed on stdin).
+    """
+    options = ()
+    if model_params:
+        options = tuple((key, str(value)) for key, value in sorted(model_params.items()) if value is not None)
+    return list(_build_llm_command_cached(model, system_prompt, options))
+
+# Known error signatures, matched in a single scan of the error message
+_ERROR_RE = re.compile(
+    r"(?P<quota>Resource has been exhausted)"
+    r"|(?P<capability>Model does not support system prompts)"
+    r"|(?P<connection>(?i:connection|timeout|network))"
+)
+
+def _classify_error(model_name: str, error_msg: str) -> LLMError:
+    """Map an llm error message to the matching user-friendly LLMError."""
+    found = {match.lastgroup for match in _ERROR_RE.finditer(error_msg)}
+    if "quota" in found:
+        return LLMQuotaError("API quota exceeded. Please try again later or check your subscription limits.")
+    elif "capability" in found:
+        return LLMCapabilityError(f"Model '{model_name}' doesn't support system prompts. Try a different model or remove the system prompt.")
+    elif "connection" in found:
+        return LLMConnectionError("Connection error. Please check your internet connection and try again.")
+    else:
+        return LLMError(f"LLM command failed: {error_msg}")
+
+def _run_llm_in_process(
+    model_name: str,
+    user_prompt: str,
+    system_prompt: Optional[str] = None,
+    model_params: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Run a completion through the llm package, without starting a process."""
+    options = {key: value for key, value in (model_params or {}).items() if value is not None}
+    try:
+        model = _llm_models.get(model_name)
+        if model is None:
+            model = _llm_models[model_name] = llm_lib.get_model(model_name)
+        response = model.prompt(user_prompt, system=system_prompt, **options)
+        return response.text().strip()
+    except Exception as e:
+        raise _classify_error(model_name, str(e)) from e
 
 def run_llm(
     model_name: str,
@@ -83,37 +146,29 @@ def run_llm(
         LLMConnectionError: When there are connection issues
         LLMError: For other LLM-related errors
     """
+    if llm_lib is not None:
+        logger.info("Running llm completion in-process with model: %s", model_name)
+        logger.info("User prompt: %s", user_prompt)
+        if system_prompt:
+            logger.info("System prompt: %s", system_prompt)
+        return _run_llm_in_process(model_name, user_prompt, system_prompt, model_params)
+
     cmd = _build_llm_command(model_name, system_prompt, model_params)
     
     # Log the command and input
-    logger.info("Running LLM command: %s", " ".join(cmd))
-    logger.info("User prompt: %s", user_prompt)
-    if system_prompt:
-        logger.info("System prompt: %s", system_prompt)
-
-    # Create subprocess and pipe the user prompt to it
-    process = subprocess.Popen(
-        cmd,
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
-    )
-    
-    stdout, stderr = process.communicate(user_prompt.encode())
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Running LLM command: %s", " ".join(cmd))
+        logger.info("User prompt: %s", user_prompt)
+        if system_prompt:
+            logger.info("System prompt: %s", system_prompt)
+
+    # Run the command with the user prompt on stdin
+    process = subprocess.run(cmd, input=user_prompt, capture_output=True, encoding="utf-8")
     
     if process.returncode != 0:
-        error_msg = stderr.decode().strip()
-        
-        if "Resource has been exhausted" in error_msg:
-            raise LLMQuotaError("API quota exceeded. Please try again later or check your subscription limits.")
-        elif "Model does not support system prompts" in error_msg:
-            raise LLMCapabilityError(f"Model '{model_name}' doesn't support system prompts. Try a different model or remove the system prompt.")
-        elif any(term in error_msg.lower() for term in ["connection", "timeout", "network"]):
-            raise LLMConnectionError("Connection error. Please check your internet connection and try again.")
-        else:
-            raise LLMError(f"LLM command failed: {error_msg}")
+        raise _classify_error(model_name, process.stderr.strip())
     
-    return stdout.decode().strip()
+    return process.stdout.strip()
 
 def run_embed(embed_model: str, text: str) -> List[float]:
     """
@@ -123,48 +178,72 @@ def run_embed(embed_model: str, text: str) -> List[float]:
     :param text: The text to be embedded.
     :return: A list of floats representing the embedding vector.
     """
-    # Escape any single quotes in the text
-    escaped_text = text.replace("'", "'\"'\"'")
-    cmd = ["llm", "embed", "-m", embed_model, "-c", "'" + escaped_text + "'"]
+    if llm_lib is not None:
+        logger.info("Running llm embedding in-process with model: %s", embed_model)
+        try:
+            return list(_get_embed_model(embed_model).embed(text))
+        except Exception as e:
+            raise RuntimeError(f"LLM embedding failed: {e}") from e
+
+    # Pass the text on stdin ('-i -'), so it needs no quoting and isn't limited by argv size
+    cmd = ["llm", "embed", "-m", embed_model, "-i", "-"]
     
     # Log the command and input
-    logger.info("Running LLM embed command: %s", " ".join(cmd))
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Running LLM embed command: %s", " ".join(cmd))
     
-    process = subprocess.Popen(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
-    )
-    
-    stdout, stderr = process.communicate()
+    process = subprocess.run(cmd, input=text, capture_output=True, encoding="utf-8")
+    stdout, stderr = process.stdout, process.stderr
     
     # Log raw output for debugging (truncate to 70 chars)
-    logger.info("Embed command stdout: %s", (stdout.decode()[:70] + "...") if stdout else "None")
-    logger.info("Embed command stderr: %s", (stderr.decode()[:70] + "...") if stderr else "None")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Embed command stdout: %s", (stdout[:70] + "...") if stdout else "None")
+        logger.info("Embed command stderr: %s", (stderr[:70] + "...") if stderr else "None")
     
     if process.returncode != 0:
-        error_msg = stderr.decode().strip()
+        error_msg = stderr.strip()
         raise RuntimeError(f"LLM embedding failed: {error_msg}")
     
     # Parse the embedding output (assuming it's JSON formatted)
     try:
-        stdout_str = stdout.decode().strip()
-        # Show first 40 and last 40 chars if string is longer than 80 chars
-        if len(stdout_str) > 80:
-            truncated = f"{stdout_str[:40]}...{stdout_str[-40:]}"
-        else:
-            truncated = stdout_str
-        logger.info("Trying to parse JSON: %s", truncated)
-        embedding_data = json.loads(stdout_str)
+        stdout_str = stdout.strip()
+        if logger.isEnabledFor(logging.INFO):
+            # Show first 40 and last 40 chars if string is longer than 80 chars
+            if len(stdout_str) > 80:
+                truncated = f"{stdout_str[:40]}...{stdout_str[-40:]}"
+            else:
+                truncated = stdout_str
+            logger.info("Trying to parse JSON: %s", truncated)
+        embedding_data = _json_loads(stdout_str)
         return embedding_data  # Return raw list
     except json.JSONDecodeError as e:
         raise RuntimeError(f"Failed to parse embedding output: {e}")
 
-def get_models() -> List[str]:
+def run_embed_batch(embed_model: str, texts: List[str]) -> List[List[float]]:
+    """
+    Get embedding vectors for several texts using the llm command line tool.
+
+    In-process, the texts are passed to the model's embed_multi() so it can batch them.
+    'llm embed' takes a single text, so without the llm package the texts are embedded
+    one after another.
+
+    :param embed_model: The name of the embedding model.
+    :param texts: The texts to be embedded.
+    :return: One embedding vector per text, in the order of the texts.
+    """
+    if llm_lib is not None:
+        logger.info("Running llm batch embedding in-process with model: %s (%d texts)", embed_model, len(texts))
+        try:
+            return [list(vector) for vector in _get_embed_model(embed_model).embed_multi(texts)]
+        except Exception as e:
+            raise RuntimeError(f"LLM embedding failed: {e}") from e
+    return [run_embed(embed_model, text) for text in texts]
+
+def get_models() -> Tuple[str, ...]:
     """
-    Return a list of models supported by this module.
+    Return the models supported by this module.
 
-    :return: A list of model names.
+    :return: A tuple of model names.
     """
     try:
         result = subprocess.run(['llm', 'models'], 
@@ -190,10 +269,15 @@ def get_models() -> List[str]:
                 seen.add(model_part)
                 models.append(model_part)
 
-        return models
+        return tuple(models)
     except subprocess.CalledProcessError as e:
         logger.error(f"Error running 'llm models': {e}")
         return DEFAULT_MODELS
     except Exception as e:
         logger.error(f"Unexpected error getting LLM models: {e}")
         return DEFAULT_MODELS
+
+def warm_up() -> None:
+    """
+    Nothing to load ahead of time; the llm package, if present, is imported with this module.
+    """
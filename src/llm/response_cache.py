@@ -0,0 +1,143 @@
+# response_cache.py
+"""
+A small on-disk cache for deterministic LLM responses and embeddings.
+
+Entries are stored in a SQLite database under ~/.promptolab/cache/ and keyed by
+a blake2b hash of the canonicalized request, so identical requests are served
+from disk instead of making another network round-trip. Responses are kept with
+the time they were stored, embeddings as raw float32 bytes with that time.
+
+Public methods:
+1. make_key(**parts) -> str
+2. ResponseCache.get(key: str, max_age: Optional[float] = None) -> Optional[str]
+3. ResponseCache.put(key: str, value: str) -> None
+4. ResponseCache.get_vector(key: str, max_age: Optional[float] = None) -> Optional[np.ndarray]
+5. ResponseCache.put_vector(key: str, vector) -> None
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Sequence, TYPE_CHECKING
+
+# numpy is only needed for embeddings and is imported on first use
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path.home() / ".promptolab" / "cache" / "responses.sqlite3"
+
+
+def make_key(**parts: Any) -> str:
+    """
+    Build a cache key from the parts of a request.
+
+    :param parts: The request fields (model, prompts, parameters, ...). Values must be JSON serializable.
+    :return: A hex digest identifying the request.
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=32).hexdigest()
+
+
+class ResponseCache:
+    """Thread-safe key/value store backed by SQLite. Cache failures are logged and ignored."""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first use so that importing this module never touches the disk
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, ts INTEGER NOT NULL DEFAULT 0)"
+            )
+            # Caches written before responses had a timestamp get one; their
+            # entries count as stored at time 0, so any max_age expires them
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+            if "ts" not in columns:
+                self._conn.execute("ALTER TABLE responses ADD COLUMN ts INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, vec BLOB NOT NULL, ts INTEGER NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[str]:
+        """
+        Return the cached value for key, or None on a miss.
+
+        :param max_age: If given, entries stored more than max_age seconds ago count as misses.
+        """
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT value, ts FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Response cache read failed: %s", e)
+            return None
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        """Store value under key, replacing any previous entry."""
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, ts) VALUES (?, ?, ?)",
+                    (key, value, int(time.time()))
+                )
+                conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Response cache write failed: %s", e)
+
+    def get_vector(self, key: str, max_age: Optional[float] = None) -> Optional["np.ndarray"]:
+        """
+        Return the cached embedding for key as a 1-D float32 array, or None on a miss.
+
+        :param max_age: If given, entries stored more than max_age seconds ago count as misses.
+        """
+        import numpy as np
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT vec, ts FROM embeddings WHERE key = ?", (key,)
+                ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Embedding cache read failed: %s", e)
+            return None
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def put_vector(self, key: str, vector: Sequence[float]) -> None:
+        """Store an embedding under key as float32 bytes, replacing any previous entry."""
+        import numpy as np
+        blob = np.asarray(vector, dtype=np.float32).tobytes()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, vec, ts) VALUES (?, ?, ?)",
+                    (key, blob, int(time.time()))
+                )
+                conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Embedding cache write failed: %s", e)
+
+
+# Global cache instance
+response_cache = ResponseCache()
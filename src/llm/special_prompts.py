@@ -1,5 +1,34 @@
-def get_TAG_pattern_improvement_prompt():
-    improve_prompt_instructions = '''
+# Instructions shared by all pattern improvement prompts. They come first so that
+# the prompts share a long common prefix that providers can serve from their prompt cache.
+_SHARED_HEADER = '''
+# Input Format
+Provide prompts for improvement between XML tags:
+ <original_prompt> 
+ original prompt text
+ </original_prompt>
+
+# Output Format
+1. Improved prompt in clean Markdown
+2. No explanatory text or meta-commentary
+3. Ready for direct LLM use
+
+# Response Guidelines
+- Maintain original prompt's core purpose
+- Enhance clarity and specificity
+- Add appropriate guardrails and validation
+- Structure for optimal LLM processing
+- Include relevant examples where beneficial
+- Optimize for current SOTA LLM capabilities
+
+# Verification Steps
+Before finalizing output:
+1. Verify all critical elements are preserved
+2. Confirm clarity of instructions
+3. Validate example consistency
+4. Check for potential ambiguities
+'''
+
+_TAG_PROMPT = _SHARED_HEADER + '''
 # Role and Purpose
 You are an expert prompt engineer that improves LLM prompts using advanced prompting techniques. 
 You transform the input prompt into a well-structured prompt following the Task-Action-Guideline (TAG) pattern.
@@ -56,39 +85,12 @@ Guideline:
 3. Avoid using overly complex terminology; keep the language simple and accessible.
 4. Include comments in the code to explain each step.
 </Example2>
-
-# Input Format
-Provide prompts for improvement between XML tags:
- <original_prompt> 
- original prompt text
- </original_prompt>
-
-# Output Format
-1. Improved prompt in clean Markdown
-2. No explanatory text or meta-commentary
-3. Ready for direct LLM use
-
-# Response Guidelines
-- Maintain original prompt's core purpose
-- Enhance clarity and specificity
-- Add appropriate guardrails and validation
-- Structure for optimal LLM processing
-- Include relevant examples where beneficial
-- Optimize for current SOTA LLM capabilities
-
-# Verification Steps
-Before finalizing output:
-1. Verify all critical elements are preserved
-2. Confirm clarity of instructions
-3. Validate example consistency
-4. Check for potential ambiguities
 '''
-    # Use repr() to properly escape all special characters, then strip the outer quotes
-    escaped_prompt = repr(improve_prompt_instructions)[1:-1]
-    return f"{escaped_prompt}"
 
-def get_PIC_pattern_improvement_prompt():
-    improve_prompt_instructions = '''
+def get_TAG_pattern_improvement_prompt():
+    return _TAG_PROMPT
+
+_PIC_PROMPT = _SHARED_HEADER + '''
 # Role and Purpose
 You are an expert prompt engineer that improves LLM prompts using advanced prompting techniques. 
 You transform the input prompt into a well-structured prompt following the Persona-Instruction-Context (PIC) pattern.
@@ -137,39 +139,12 @@ Instruction:
 6. Write tests for the API endpoints.
 Context: The user is new to software development and needs guidance on setting up a Node.js project.
 </Example2>
-
-# Input Format
-Provide prompts for improvement between XML tags:
- <original_prompt> 
- original prompt text
- </original_prompt>
-
-# Output Format
-1. Improved prompt in clean Markdown
-2. No explanatory text or meta-commentary
-3. Ready for direct LLM use
-
-# Response Guidelines
-- Maintain original prompt's core purpose
-- Enhance clarity and specificity
-- Add appropriate guardrails and validation
-- Structure for optimal LLM processing
-- Include relevant examples where beneficial
-- Optimize for current SOTA LLM capabilities
-
-# Verification Steps
-Before finalizing output:
-1. Verify all critical elements are preserved
-2. Confirm clarity of instructions
-3. Validate example consistency
-4. Check for potential ambiguities
 '''
-    # Use repr() to properly escape all special characters, then strip the outer quotes
-    escaped_prompt = repr(improve_prompt_instructions)[1:-1]
-    return f"{escaped_prompt}"
 
-def get_LIFE_pattern_improvement_prompt():
-    improve_prompt_instructions = '''
+def get_PIC_pattern_improvement_prompt():
+    return _PIC_PROMPT
+
+_LIFE_PROMPT = _SHARED_HEADER + '''
 # Role and Purpose
 You are an expert prompt engineer that improves LLM prompts using advanced prompting techniques. 
 You transform the input prompt into a well-structured prompt following the Learn-Improvise-Feedback-Evaluate (LIFE) pattern.
@@ -256,39 +231,12 @@ Evaluate:
 2. Verify results accuracy
 3. Refine analysis based on feedback
 </Example2>
-
-# Input Format
-Provide prompts for improvement between XML tags:
- <original_prompt> 
- original prompt text
- </original_prompt>
-
-# Output Format
-1. Improved prompt in clean Markdown
-2. No explanatory text or meta-commentary
-3. Ready for direct LLM use
-
-# Response Guidelines
-- Maintain original prompt's core purpose
-- Enhance clarity and specificity
-- Add appropriate guardrails and validation
-- Structure for optimal LLM processing
-- Include relevant examples where beneficial
-- Optimize for current SOTA LLM capabilities
-
-# Verification Steps
-Before finalizing output:
-1. Verify all critical elements are preserved
-2. Confirm clarity of instructions
-3. Validate example consistency
-4. Check for potential ambiguities
 '''
-    # Use repr() to properly escape all special characters, then strip the outer quotes
-    escaped_prompt = repr(improve_prompt_instructions)[1:-1]
-    return f"{escaped_prompt}"
 
-def get_grader_system_prompt():
-    grader_system_prompt = '''
+def get_LIFE_pattern_improvement_prompt():
+    return _LIFE_PROMPT
+
+_GRADER_SYSTEM_PROMPT = '''
 You are an expert evaluator of language model outputs. Your task is to:
 1. Compare the quality and correctness of two outputs (baseline and current) for the same user prompt
 2. Assess how well each output addresses the user's needs
@@ -306,9 +254,21 @@ Grade: [comparative grade (-2, -1, 0, +1, or +2)]
 ---
 [detailed feedback]
 '''
-    # Use repr() to properly escape all special characters, then strip the outer quotes
-    escaped_prompt = repr(grader_system_prompt)[1:-1]
-    return f"{escaped_prompt}"
+
+# Static parts of the <original_prompt> block sent with the pattern prompts
+_ORIGINAL_PROMPT_USER_ONLY = ("<original_prompt>\n User: ", "\n</original_prompt>")
+_ORIGINAL_PROMPT_WITH_SYSTEM = ("<original_prompt>\nSystem: ", "\n\nUser: ", "\n</original_prompt>")
+
+def wrap_original_prompt(user_prompt, system_prompt=None):
+    """Wrap a prompt in the <original_prompt> block expected by the pattern prompts."""
+    if system_prompt:
+        prefix, middle, suffix = _ORIGINAL_PROMPT_WITH_SYSTEM
+        return "".join((prefix, system_prompt, middle, user_prompt, suffix))
+    prefix, suffix = _ORIGINAL_PROMPT_USER_ONLY
+    return "".join((prefix, user_prompt, suffix))
+
+def get_grader_system_prompt():
+    return _GRADER_SYSTEM_PROMPT
 
 def get_grader_instructions(user_prompt, baseline, current):
     grader_instructions = f'''
@@ -323,6 +283,4 @@ Current Output:
 
 Please evaluate the current output compared to the baseline.
 '''
-    # Use repr() to properly escape all special characters, then strip the outer quotes
-    escaped_prompt = repr(grader_instructions)[1:-1]
-    return f"{escaped_prompt}"
+    return grader_instructions
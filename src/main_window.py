@@ -1,22 +1,16 @@
-import sys
-from pathlib import Path
 from PySide6.QtWidgets import (QMainWindow, QTabWidget, QWidget, QVBoxLayout,
                               QMenuBar, QMenu)
 from PySide6.QtCore import QSettings, Slot
 import logging
 
-# Add the project root directory to Python path
-project_root = str(Path(__file__).parent.parent)
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
-
-from src.modules.prompt_catalog.prompts_catalog import PromptsCatalogWidget
-from src.modules.llm_playground.llm_playground import LLMPlaygroundWidget
-from src.modules.test_set_manager.test_set_manager import TestSetManagerWidget
-from src.modules.eval_playground.evaluation_widget import EvaluationWidget
 from src.storage.storage import FileStorage
 from src.storage.test_storage import TestSetStorage
 from src.utils.settings_dialog import SettingsDialog
+from src.llm.llm_utils_adapter import LLMWorker
+
+# Tab order in the main window
+CATALOG_TAB, PLAYGROUND_TAB, TEST_SETS_TAB, EVALUATION_TAB = range(4)
+TAB_LABELS = ("📚 Prompt Catalog", "🧪 LLM Playground", "📋 Test Sets", "📊 Test Evaluation")
 
 class MainWindow(QMainWindow):
     def __init__(self, prompt_storage: FileStorage, test_set_storage: TestSetStorage):
@@ -35,35 +29,104 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(central_widget)
         layout = QVBoxLayout(central_widget)
         
-        # Create tab widget
-        self.tabs = QTabWidget()  # Make tabs accessible as instance variable
+        # Load the LLM backend and its model list while the tabs are being built
+        LLMWorker.warm_up()
         
-        # Create and add widgets to tabs
-        self.prompts_catalog = PromptsCatalogWidget(self.prompt_storage, self.settings)
-        self.llm_playground = LLMPlaygroundWidget(self.settings)
-        self.test_set_manager = TestSetManagerWidget(self.test_set_storage, self.settings)
-        self.evaluation_widget = EvaluationWidget(self.test_set_storage, self.settings)
-        
-        self.tabs.addTab(self.prompts_catalog, "📚 Prompt Catalog")
-        self.tabs.addTab(self.llm_playground, "🧪 LLM Playground")
-        self.tabs.addTab(self.test_set_manager, "📋 Test Sets")
-        self.tabs.addTab(self.evaluation_widget, "📊 Test Evaluation")
+        # Create tab widget. Each tab starts as an empty placeholder and its module
+        # widget is only built when the tab is first shown (or first accessed).
+        self.tabs = QTabWidget()  # Make tabs accessible as instance variable
+        self._tab_factories = {
+            CATALOG_TAB: self._create_prompts_catalog,
+            PLAYGROUND_TAB: self._create_llm_playground,
+            TEST_SETS_TAB: self._create_test_set_manager,
+            EVALUATION_TAB: self._create_evaluation_widget,
+        }
+        self._tab_widgets = {}
+        # Prompt selected in the catalog before the playground tab was built
+        self._pending_prompt = None
+        for label in TAB_LABELS:
+            self.tabs.addTab(QWidget(), label)
+        self.tabs.currentChanged.connect(self._ensure_tab)
         
         layout.addWidget(self.tabs)
         
         # Create status bar
         self.statusBar().showMessage("Ready")
         
-        # Connect signals
-        self.test_set_manager.test_set_updated.connect(self.evaluation_widget.update_test_set)
-        self.prompts_catalog.prompt_selected_for_eval.connect(self.on_prompt_selected_for_eval)
-        self.evaluation_widget.status_changed.connect(self.show_status)
-        
-        # Load initial data after signals are connected
-        self.prompts_catalog.load_prompts()
+        # Build the tab that is shown first
+        self._ensure_tab(self.tabs.currentIndex())
         
         self.setup_menu()
         
+    @Slot(int)
+    def _ensure_tab(self, index: int) -> QWidget:
+        """Return the module widget of a tab, replacing its placeholder on first use."""
+        widget = self._tab_widgets.get(index)
+        if widget is None:
+            widget = self._tab_factories[index]()
+            self._tab_widgets[index] = widget
+            placeholder = self.tabs.widget(index)
+            current = self.tabs.currentIndex()
+            # Swapping the page must not re-enter this slot via currentChanged
+            self.tabs.blockSignals(True)
+            try:
+                self.tabs.removeTab(index)
+                self.tabs.insertTab(index, widget, TAB_LABELS[index])
+                self.tabs.setCurrentIndex(current)
+            finally:
+                self.tabs.blockSignals(False)
+            placeholder.deleteLater()
+            # Loading may emit signals whose handlers look the tab up again, so
+            # it happens only once the widget is registered
+            self._init_tab(index, widget)
+        return widget
+
+    def _init_tab(self, index: int, widget: QWidget):
+        """Load the initial data of a newly built tab."""
+        if index == CATALOG_TAB:
+            widget.load_prompts()
+        elif index == PLAYGROUND_TAB and self._pending_prompt is not None:
+            widget.set_prompt(self._pending_prompt)
+            self._pending_prompt = None
+
+    def _create_prompts_catalog(self):
+        from src.modules.prompt_catalog.prompts_catalog import PromptsCatalogWidget
+        widget = PromptsCatalogWidget(self.prompt_storage, self.settings)
+        widget.prompt_selected_for_eval.connect(self.on_prompt_selected_for_eval)
+        return widget
+
+    def _create_llm_playground(self):
+        from src.modules.llm_playground.llm_playground import LLMPlaygroundWidget
+        return LLMPlaygroundWidget(self.settings)
+
+    def _create_test_set_manager(self):
+        from src.modules.test_set_manager.test_set_manager import TestSetManagerWidget
+        widget = TestSetManagerWidget(self.test_set_storage, self.settings)
+        widget.test_set_updated.connect(self.on_test_set_updated)
+        return widget
+
+    def _create_evaluation_widget(self):
+        from src.modules.eval_playground.evaluation_widget import EvaluationWidget
+        widget = EvaluationWidget(self.test_set_storage, self.settings)
+        widget.status_changed.connect(self.show_status)
+        return widget
+
+    @property
+    def prompts_catalog(self):
+        return self._ensure_tab(CATALOG_TAB)
+
+    @property
+    def llm_playground(self):
+        return self._ensure_tab(PLAYGROUND_TAB)
+
+    @property
+    def test_set_manager(self):
+        return self._ensure_tab(TEST_SETS_TAB)
+
+    @property
+    def evaluation_widget(self):
+        return self._ensure_tab(EVALUATION_TAB)
+
     def setup_menu(self):
         menubar = self.menuBar()
         
@@ -78,28 +141,33 @@ class MainWindow(QMainWindow):
     @Slot()
     def show_settings_dialog(self):
         dialog = SettingsDialog(self)
-        # Connect the api_changed signal to both widgets
-        dialog.api_changed.connect(self.llm_playground.update_models)
-        dialog.api_changed.connect(self.evaluation_widget.update_models)
+        # Connect the api_changed signal to the widgets that are already built;
+        # the others read the current API when they are created
+        for index in (PLAYGROUND_TAB, EVALUATION_TAB):
+            widget = self._tab_widgets.get(index)
+            if widget is not None:
+                dialog.api_changed.connect(widget.update_models)
         dialog.exec()
 
     def cleanup(self):
         """Clean up all widgets with threads before application exit."""
         logging.debug("Starting MainWindow cleanup...")
         
-        # Clean up evaluation widget
-        if hasattr(self, 'evaluation_widget'):
+        # Clean up evaluation widget (tabs that were never shown have nothing to clean up)
+        evaluation_widget = self._tab_widgets.get(EVALUATION_TAB)
+        if evaluation_widget is not None:
             logging.debug("Cleaning up evaluation widget...")
             try:
-                self.evaluation_widget.cleanup_threads()
+                evaluation_widget.cleanup_threads()
             except Exception as e:
                 logging.error(f"Error cleaning up evaluation widget: {e}")
             
         # Clean up playground widget
-        if hasattr(self, 'llm_playground'):
+        llm_playground = self._tab_widgets.get(PLAYGROUND_TAB)
+        if llm_playground is not None:
             logging.debug("Cleaning up playground widget...")
             try:
-                self.llm_playground.cleanup_threads()
+                llm_playground.cleanup_threads()
             except Exception as e:
                 logging.error(f"Error cleaning up playground widget: {e}")
             
@@ -120,11 +188,22 @@ class MainWindow(QMainWindow):
             return
             
         selected_title = current.text()
-        selected_prompt = next((p for p in self.prompts_catalog._prompts if p.title == selected_title), None)
+        selected_prompt = next((p for p in self._tab_widgets[CATALOG_TAB]._prompts if p.title == selected_title), None)
         
         if selected_prompt:
-            # Update the LLM Playground with the selected prompt
-            self.llm_playground.set_prompt(selected_prompt)
+            # Update the LLM Playground with the selected prompt, or keep the prompt
+            # until the playground tab is first shown
+            llm_playground = self._tab_widgets.get(PLAYGROUND_TAB)
+            if llm_playground is not None:
+                llm_playground.set_prompt(selected_prompt)
+            else:
+                self._pending_prompt = selected_prompt
+
+    def on_test_set_updated(self, test_set):
+        """Forward test set changes to the evaluation tab if it has been built."""
+        evaluation_widget = self._tab_widgets.get(EVALUATION_TAB)
+        if evaluation_widget is not None:
+            evaluation_widget.update_test_set(test_set)
 
     def show_status(self, message, timeout=5000):
         """Show a message in the status bar with optional timeout in milliseconds."""
@@ -707,13 +707,10 @@ class EvaluationWidget(QWidget):
         metadata['overall_grade'] = total_grade
         metadata['valid_results'] = valid_results
         
-        # Generate HTML report
+        # Generate the HTML report straight into the file
         report_generator = HtmlEvalReport()
-        html_content = report_generator.generate_report(self.evaluation_results, metadata)
-        
-        # Write HTML content to file
         with open(file_name, "w", encoding='utf-8') as file:
-            file.write(html_content)
+            report_generator.generate_report_to(file, self.evaluation_results, metadata)
             
         self.show_status("Evaluation results exported successfully", 5000)
 
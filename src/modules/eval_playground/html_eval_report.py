@@ -1,45 +1,52 @@
 """Module for generating HTML evaluation reports with markdown support."""
 
+import re
+import threading
+from functools import lru_cache
 import markdown
-from typing import List
+from typing import Iterator, List, TextIO
 
-class AnalysisResult:
-    def __init__(self, input_text, baseline_output, current_output, similarity_score, llm_grade):
-        self.input_text = input_text
-        self.baseline_output = baseline_output
-        self.current_output = current_output
-        self.similarity_score = similarity_score
-        self.llm_grade = llm_grade
+from src.modules.eval_playground.output_analyzer import AnalysisResult
 
-class HtmlEvalReport:
-    """Class for generating HTML evaluation reports with markdown support."""
-    
-    def __init__(self):
-        self.md = markdown.Markdown(extensions=['tables', 'fenced_code'])
-        
-    def generate_report(self, evaluation_results: List[AnalysisResult], metadata: dict) -> str:
-        """Generate an HTML report from evaluation results.
-        
-        Args:
-            evaluation_results: List of AnalysisResult objects containing evaluation results
-            metadata: Dictionary containing evaluation metadata:
-                     - test_set_name: Name of the test set used
-                     - baseline_system_prompt: System prompt used for baseline results
-                     - new_system_prompt: System prompt used for comparison evaluation
-                     - model_name: Name of the LLM model used
-        
-        Returns:
-            str: Complete HTML document as a string
-        """
-        html_content = self._get_html_header()
-        html_content += self._generate_metadata_section(metadata)
-        html_content += self._generate_table_content(evaluation_results)
-        html_content += self._get_html_footer()
-        return html_content
-    
-    def _get_html_header(self) -> str:
-        """Get the HTML header with CSS styling."""
-        return """
+_MARKDOWN_EXTENSIONS = ['tables', 'fenced_code']
+
+# Markdown converters keep parser state and are not thread-safe, so each thread gets its own
+_local = threading.local()
+
+def _get_markdown() -> markdown.Markdown:
+    """Return this thread's Markdown converter, creating it on first use."""
+    md = getattr(_local, "md", None)
+    if md is None:
+        # The report is an HTML (not XHTML) document
+        md = _local.md = markdown.Markdown(extensions=_MARKDOWN_EXTENSIONS, output_format="html")
+    return md
+
+# Anything on a single line that markdown could turn into markup: inline syntax,
+# raw HTML and entities, list/heading markers, rules, code indentation and hard breaks.
+# Carriage returns are line breaks to markdown, and \x02/\x03 are its internal
+# placeholder characters, so texts containing them go through the parser too.
+_MARKDOWN_SYNTAX_RE = re.compile(r"[\\`*_\[\]#|<>&~!\r\x02\x03]|^\s*(?:[-+=]+|\d+[.)])(?:\s|$)|^ {4}|\t|  $")
+
+@lru_cache(maxsize=4096)
+def _convert_markdown(text: str) -> str:
+    """Convert markdown to HTML. The conversion is deterministic, so repeated texts
+    (e.g. the same input or baseline output in several rows) are converted once."""
+    md = _get_markdown()
+    try:
+        return md.convert(text)
+    finally:
+        md.reset()
+
+def _markdown_to_html(text: str) -> str:
+    """Convert markdown to HTML, skipping the parser for single lines of plain text."""
+    if "\n" not in text and not _MARKDOWN_SYNTAX_RE.search(text):
+        # Same output as the parser: one paragraph without the leading blanks
+        text = text.lstrip()
+        return f"<p>{text}</p>" if text else ""
+    return _convert_markdown(text)
+
+# Fixed parts of the report
+_HTML_HEADER = """
         <html>
         <head>
             <style>
@@ -86,6 +93,76 @@ class HtmlEvalReport:
         <body>
             <h1>Evaluation Results</h1>
         """
+
+_GRADING_SCALE_DD = """<dd>
+                        <div style="display: grid; grid-template-columns: 80px 1fr; gap: 5px; align-items: center;">
+                            <div>👎👎</div><div>Significantly worse than baseline (-2)</div>
+                            <div>👎</div><div>Somewhat worse than baseline (-1)</div>
+                            <div>👈</div><div>About the same as baseline (0)</div>
+                            <div>👍</div><div>Somewhat better than baseline (+1)</div>
+                            <div>👍👍</div><div>Significantly better than baseline (+2)</div>
+                        </div>
+                    </dd>"""
+
+_TABLE_HEADER = """
+            <table>
+                <tr>
+                    <th>Input Text</th>
+                    <th>Baseline Output</th>
+                    <th>New Output</th>
+                    <th>Similarity Score</th>
+                    <th>LLM Grade</th>
+                </tr>
+        """
+
+_ROW_TEMPLATE = '<tr><td>%s</td><td>%s</td><td>%s</td><td class="score">%.2f</td><td>%s</td></tr>\n'
+
+_HTML_FOOTER = """
+            </table>
+        </body>
+        </html>
+        """
+
+class HtmlEvalReport:
+    """Class for generating HTML evaluation reports with markdown support."""
+    
+    def generate_report(self, evaluation_results: List[AnalysisResult], metadata: dict) -> str:
+        """Generate an HTML report from evaluation results.
+        
+        Args:
+            evaluation_results: List of AnalysisResult objects containing evaluation results
+            metadata: Dictionary containing evaluation metadata:
+                     - test_set_name: Name of the test set used
+                     - baseline_system_prompt: System prompt used for baseline results
+                     - new_system_prompt: System prompt used for comparison evaluation
+                     - model_name: Name of the LLM model used
+        
+        Returns:
+            str: Complete HTML document as a string
+        """
+        # Join the fragments once, rather than growing one string per row
+        return "".join(self._iter_fragments(evaluation_results, metadata))
+    
+    def generate_report_to(self, writer: TextIO, evaluation_results: List[AnalysisResult], metadata: dict) -> None:
+        """Write an HTML report to a text stream, e.g. an open file.
+        
+        Only one row of the report is held in memory at a time. See generate_report
+        for the arguments.
+        """
+        for fragment in self._iter_fragments(evaluation_results, metadata):
+            writer.write(fragment)
+    
+    def _iter_fragments(self, evaluation_results: List[AnalysisResult], metadata: dict) -> Iterator[str]:
+        """Yield the parts of the HTML document in order."""
+        yield self._get_html_header()
+        yield self._generate_metadata_section(metadata)
+        yield _TABLE_HEADER
+        yield from self._iter_rows(evaluation_results)
+        yield self._get_html_footer()
+    
+    def _get_html_header(self) -> str:
+        """Get the HTML header with CSS styling."""
+        return _HTML_HEADER
     
     def _generate_metadata_section(self, metadata: dict) -> str:
         """Generate the HTML for the metadata section."""
@@ -129,56 +206,30 @@ class HtmlEvalReport:
                     <dd>{metadata.get('model_name', 'N/A')}</dd>
                     
                     <dt>Baseline System Prompt:</dt>
-                    <dd>{self.md.convert(metadata.get('baseline_system_prompt', 'N/A'))}</dd>
+                    <dd>{_markdown_to_html(metadata.get('baseline_system_prompt', 'N/A'))}</dd>
 
                     <dt>New System Prompt:</dt>
-                    <dd>{self.md.convert(metadata.get('new_system_prompt', 'N/A'))}</dd>
+                    <dd>{_markdown_to_html(metadata.get('new_system_prompt', 'N/A'))}</dd>
                     
                     {overall_grade_html}
                     
                     <dt>Grading Scale:</dt>
-                    <dd>
-                        <div style="display: grid; grid-template-columns: 80px 1fr; gap: 5px; align-items: center;">
-                            <div>👎👎</div><div>Significantly worse than baseline (-2)</div>
-                            <div>👎</div><div>Somewhat worse than baseline (-1)</div>
-                            <div>👈</div><div>About the same as baseline (0)</div>
-                            <div>👍</div><div>Somewhat better than baseline (+1)</div>
-                            <div>👍👍</div><div>Significantly better than baseline (+2)</div>
-                        </div>
-                    </dd>
+                    {_GRADING_SCALE_DD}
                 </dl>
             </div>
-            <table>
-                <tr>
-                    <th>Input Text</th>
-                    <th>Baseline Output</th>
-                    <th>New Output</th>
-                    <th>Similarity Score</th>
-                    <th>LLM Grade</th>
-                </tr>
         """
     
-    def _generate_table_content(self, evaluation_results: List[AnalysisResult]) -> str:
-        """Generate the HTML table content from evaluation results."""
-        content = ""
+    def _iter_rows(self, evaluation_results: List[AnalysisResult]) -> Iterator[str]:
+        """Yield the HTML table row of each evaluation result."""
         for result in evaluation_results:
-            content += f"""
-                <tr>
-                    <td>{self.md.convert(result.input_text)}</td>
-                    <td>{self.md.convert(result.baseline_output)}</td>
-                    <td>{self.md.convert(result.current_output)}</td>
-                    <td class="score">{result.similarity_score:.2f}</td>
-                    <td>{result.llm_grade}</td>
-                </tr>
-            """
-            # Reset the markdown converter for the next iteration
-            self.md.reset()
-        return content
+            yield _ROW_TEMPLATE % (
+                _markdown_to_html(result.input_text),
+                _markdown_to_html(result.baseline_output),
+                _markdown_to_html(result.current_output),
+                result.similarity_score,
+                result.llm_grade,
+            )
     
     def _get_html_footer(self) -> str:
         """Get the HTML footer."""
-        return """
-            </table>
-        </body>
-        </html>
-        """
+        return _HTML_FOOTER
@@ -1,27 +1,69 @@
 import logging
 logging.debug('output_analyzer module imported.')
 
-import sys
+import re
 import json
+import hashlib
+from collections import OrderedDict
 from dataclasses import dataclass
-from pathlib import Path
-from typing import List
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import List, TYPE_CHECKING
 from PySide6.QtCore import QObject, Signal
 
 # Import thread management utilities
 from src.utils.thread_manager import ThreadManager
 
-# Add the project root directory to Python path
-project_root = str(Path(__file__).parent.parent.parent.parent)
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
-
-from src.llm.llm_utils_adapter import LLMWorker, EmbedWorker
+from src.config import config
+from src.llm.llm_utils_adapter import LLMWorker, BatchEmbedWorker
 from src.llm.special_prompts import (get_grader_system_prompt,
                             get_grader_instructions)
 
+# numpy is imported on first use so that loading the eval tab stays cheap
+if TYPE_CHECKING:
+    import numpy as np
+
+# Matches the grader's "Grade: <grade>\n---\n<feedback>" text format in one pass
+_GRADE_RE = re.compile(r'^\s*Grade:[ \t]*([^\n]*?)[ \t]*(?:\n-+[ \t]*)?(?:\n|\Z)(.*)\Z', re.DOTALL)
+
+# Grade as returned by the grader -> (emoji shown in the results, numerical grade)
+_GRADE_TO_EMOJI = {
+    "-2": ("👎👎", "-2"),  # Two thumbs down
+    "-1": ("👎", "-1"),    # One thumb down
+    "0": ("👈", "0"),      # Thumb pointing left (horizontal)
+    "+1": ("👍", "+1"),    # One thumb up
+    "+2": ("👍👍", "+2"),  # Two thumbs up
+    "1": ("👍", "+1"),     # Handle without + sign
+    "2": ("👍👍", "+2"),   # Handle without + sign
+}
+
+# Embeddings already fetched in this session, most recently used last. The same baseline
+# output usually appears in many rows, so most lookups after the first row are hits.
+_EMBED_MEMO_SIZE = 10000
+_embed_memo: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+
+def _embed_memo_key(text: str) -> bytes:
+    return hashlib.blake2b(f"{config.llm_api}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+def _memo_get(text: str):
+    key = _embed_memo_key(text)
+    embedding = _embed_memo.get(key)
+    if embedding is not None:
+        _embed_memo.move_to_end(key)
+    return embedding
+
+def _memo_put(text: str, embedding: "np.ndarray"):
+    _embed_memo[_embed_memo_key(text)] = embedding
+    if len(_embed_memo) > _EMBED_MEMO_SIZE:
+        _embed_memo.popitem(last=False)
+
+def _unit_vector(embedding: "np.ndarray") -> "np.ndarray":
+    """Return the embedding as a 1-D vector of length 1 (all zeros stay zeros).
+
+    The cosine similarity of two unit vectors is just their dot product."""
+    import numpy as np
+    vector = np.asarray(embedding, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
 class AnalysisError(Exception):
     """Base class for analysis errors"""
     pass
@@ -34,7 +76,7 @@ class SimilarityError(AnalysisError):
     """Error during similarity computation"""
     pass
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AnalysisResult:
     """Container for a single analysis result."""
     input_text: str
@@ -66,65 +108,53 @@ class AsyncAnalyzer(QObject):
         self.baseline = baseline
         self.current = current
         self.model = model
-        
+
+        # Identical outputs are fully similar; skip the embedding round-trips
+        if baseline == current:
+            self._get_llm_grade(1.0)
+            return
+
         # Start getting embeddings
         self._get_embeddings_async()
         
-    def _create_embed_worker(self, text: str, on_finished):
-        """Create and setup an EmbedWorker using the thread pool.
-        
-        Args:
-            text: The text to embed
-            on_finished: Callback function to handle the embedding result
-        """
-        # Create worker
-        worker = EmbedWorker(text=text)
-        
-        # Keep track of worker for cleanup
-        self.pending_embeddings.append(worker)
-
-        # Connect signals
-        worker.finished.connect(on_finished)
-        worker.error.connect(self.error.emit)
-        
-        # Start the worker (which will use the thread pool internally)
-        worker.run()
-        
     def _get_embeddings_async(self):
-        """Get embeddings for both texts asynchronously."""
+        """Get embeddings for both texts with a single batch request."""
+        # Texts embedded earlier in this session are answered without a worker
+        baseline_embedding = _memo_get(self.baseline)
+        current_embedding = _memo_get(self.current)
+        if baseline_embedding is not None and current_embedding is not None:
+            self._handle_embeddings([baseline_embedding, current_embedding])
+            return
+
         try:
-            # Start baseline embedding
-            self._create_embed_worker(
-                self.baseline,
-                lambda result: self._handle_baseline_embedding(result)
-            )
+            worker = BatchEmbedWorker(texts=[self.baseline, self.current])
             
-            # Start current embedding
-            self._create_embed_worker(
-                self.current,
-                lambda result: self._handle_current_embedding(result)
-            )
+            # Keep track of worker for cleanup
+            self.pending_embeddings.append(worker)
+
+            # Connect signals
+            worker.finished.connect(self._handle_embeddings)
+            worker.error.connect(self.error.emit)
             
-        except Exception as e:
-            self.error.emit(f"Error starting embeddings: {str(e)}")
+            # Start the worker (which will use the thread pool internally)
+            worker.run()
             
-    def _handle_baseline_embedding(self, result):
-        """Handle completion of baseline embedding."""
-        try:
-            self.baseline_embedding = np.array([eval(result)])
-            self._check_completion()
         except Exception as e:
-            self.error.emit(f"Error processing baseline embedding: {str(e)}")
+            self.error.emit(f"Error starting embeddings: {str(e)}")
             
-    def _handle_current_embedding(self, result):
-        """Handle completion of current embedding."""
+    def _handle_embeddings(self, results):
+        """Handle completion of the baseline and current embeddings (float32 arrays)."""
         try:
-            self.current_embedding = np.array([eval(result)])
+            baseline_embedding, current_embedding = results
+            _memo_put(self.baseline, baseline_embedding)
+            _memo_put(self.current, current_embedding)
+            self.baseline_embedding = _unit_vector(baseline_embedding)
+            self.current_embedding = _unit_vector(current_embedding)
             self._check_completion()
         except Exception as e:
-            self.error.emit(f"Error processing current embedding: {str(e)}")
+            self.error.emit(f"Error processing embeddings: {str(e)}")
             
-    def _validate_embedding(self, embedding: np.ndarray, name: str):
+    def _validate_embedding(self, embedding: "np.ndarray", name: str):
         """Ensure the embedding contains only finite values.
         Args:
             embedding: The numpy embedding array.
@@ -132,6 +162,7 @@ class AsyncAnalyzer(QObject):
         Raises:
             SimilarityError: If non-finite values are detected.
         """
+        import numpy as np
         if not np.isfinite(embedding).all():
             raise SimilarityError(f"{name} embedding contains non-finite values (NaN or Inf).")
 
@@ -146,8 +177,9 @@ class AsyncAnalyzer(QObject):
                 self.error.emit(str(e))
                 return
 
-            # Calculate similarity only if embeddings are valid
-            similarity = cosine_similarity(self.baseline_embedding, self.current_embedding)[0][0]
+            # Calculate similarity only if embeddings are valid. Both are unit vectors,
+            # so the cosine similarity is their dot product.
+            similarity = float(self.baseline_embedding @ self.current_embedding)
             
             # Start LLM grading
             self._get_llm_grade(similarity)
@@ -182,63 +214,54 @@ class AsyncAnalyzer(QObject):
         except Exception as e:
             self.error.emit(f"Error getting LLM evaluation: {str(e)}")
             
+    def _parse_grade_lines(self, result):
+        """Line-based grade parser for responses that don't match _GRADE_RE."""
+        lines = result.strip().split('\n')
+        if not lines:
+            raise ValueError("Empty LLM response")
+
+        # First line should contain the grade
+        grade_line = lines[0]
+        grade = grade_line.replace('Grade:', '').strip()
+
+        # Rest is feedback
+        feedback = '\n'.join(lines[1:]).strip()
+        return grade, feedback
+
     def _handle_grade_result(self, result, similarity):
         """Handle completion of LLM grading."""
         try:
-            # Try parsing as JSON first
-            try:
-                grade_dict = json.loads(result)
+            # Only a reply starting with "{" can be a JSON object, so text replies
+            # skip the JSON parser and its exception entirely
+            grade_dict = None
+            if result.lstrip().startswith("{"):
+                try:
+                    grade_dict = json.loads(result)
+                except json.JSONDecodeError:
+                    pass
+            if isinstance(grade_dict, dict):
                 grade = grade_dict.get('grade', 'ERROR')
                 feedback = grade_dict.get('feedback', 'No feedback provided')
-            except json.JSONDecodeError:
+            else:
                 # Fallback to text format parsing
-                lines = result.strip().split('\n')
-                if not lines:
-                    raise ValueError("Empty LLM response")
-                    
-                # First line should contain the grade
-                grade_line = lines[0]
-                grade = grade_line.replace('Grade:', '').strip()
-                
-                # Rest is feedback
-                feedback = '\n'.join(lines[1:]).strip()
-            
-            # Validate and normalize the grade format
-            try:
-                # Check if the grade is in the comparative format (-2, -1, 0, +1, +2)
-                # Remove any spaces and ensure + sign is preserved
-                normalized_grade = grade.replace(" ", "")
-                
-                # Map numerical grades to thumb emojis
-                grade_to_emoji = {
-                    "-2": "👎👎",  # Two thumbs down
-                    "-1": "👎",    # One thumb down
-                    "0": "👈",     # Thumb pointing left (horizontal)
-                    "+1": "👍",    # One thumb up
-                    "+2": "👍👍",  # Two thumbs up
-                    "1": "👍",     # Handle without + sign
-                    "2": "👍👍"    # Handle without + sign
-                }
-                
-                # Store both the numerical grade (for sorting/filtering) and the emoji (for display)
-                if normalized_grade in grade_to_emoji:
-                    emoji_grade = grade_to_emoji[normalized_grade]
-                    # Keep the numerical grade as part of the object for potential sorting/filtering
-                    numerical_grade = normalized_grade
-                    if normalized_grade == "1":
-                        numerical_grade = "+1"
-                    elif normalized_grade == "2":
-                        numerical_grade = "+2"
-                    display_grade = emoji_grade
+                match = _GRADE_RE.match(result)
+                if match:
+                    grade = match.group(1)
+                    feedback = match.group(2).strip()
                 else:
-                    # If not in expected format, use as-is with a warning
-                    display_grade = f"{normalized_grade} (invalid)"
-                    numerical_grade = normalized_grade
-                    logging.warning(f"Unexpected grade format: {grade}")
-            except Exception as e:
-                display_grade = grade  # Use original if parsing fails
-                numerical_grade = grade
-                logging.warning(f"Error normalizing grade: {e}")
+                    grade, feedback = self._parse_grade_lines(result)
+            
+            # Normalize the comparative grade (-2, -1, 0, +1, +2): remove spaces, keep the + sign.
+            # JSON responses may carry the grade as a number.
+            normalized_grade = str(grade).replace(" ", "")
+            grade_entry = _GRADE_TO_EMOJI.get(normalized_grade)
+            if grade_entry is not None:
+                display_grade, numerical_grade = grade_entry
+            else:
+                # If not in expected format, use as-is with a warning
+                display_grade = f"{normalized_grade} (invalid)"
+                numerical_grade = normalized_grade
+                logging.warning(f"Unexpected grade format: {grade}")
             
             # Create final result
             analysis_result = AnalysisResult(
@@ -1,13 +1,16 @@
+from typing import Optional, Sequence
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
-                               QSpinBox, QPushButton)
+                               QSpinBox, QPushButton, QComboBox)
 
 class CritiqueRefineConfigDialog(QDialog):
     """Dialog for configuring the critique and refine process."""
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, models: Sequence[str] = (), current_model: Optional[str] = None):
         super().__init__(parent)
         self.setWindowTitle("Critique & Refine Configuration")
         self.setMinimumWidth(400)
+        self.models = models
+        self.current_model = current_model
         self.setup_ui()
         
     def setup_ui(self):
@@ -25,6 +28,25 @@ class CritiqueRefineConfigDialog(QDialog):
         iterations_layout.addWidget(self.iterations_spin)
         layout.addLayout(iterations_layout)
         
+        # Critique model
+        critique_model_layout = QHBoxLayout()
+        critique_model_label = QLabel("Critique model:")
+        self.critique_model_combo = QComboBox()
+        self.critique_model_combo.addItems(self.models)
+        if self.current_model:
+            index = self.critique_model_combo.findText(self.current_model)
+            if index < 0:
+                self.critique_model_combo.addItem(self.current_model)
+                index = self.critique_model_combo.count() - 1
+            self.critique_model_combo.setCurrentIndex(index)
+        self.critique_model_combo.setToolTip(
+            "Model that writes the critique. A cheaper model than the selected one "
+            "saves cost; the refined prompt is always written by the selected model."
+        )
+        critique_model_layout.addWidget(critique_model_label)
+        critique_model_layout.addWidget(self.critique_model_combo)
+        layout.addLayout(critique_model_layout)
+        
         # Description
         description = QLabel(
             "The Critique & Refine method will iteratively improve your prompt by:\n"
@@ -50,3 +72,7 @@ class CritiqueRefineConfigDialog(QDialog):
     def get_iterations(self) -> int:
         """Get the number of iterations from the dialog."""
         return self.iterations_spin.value()
+    
+    def get_critique_model(self) -> Optional[str]:
+        """Get the model selected for writing critiques, or None if there is none."""
+        return self.critique_model_combo.currentText() or None
@@ -1,16 +1,72 @@
 import re
 import logging
+from difflib import SequenceMatcher
 from typing import Dict, Any, Optional
-from pathlib import Path
-import sys
 from PySide6.QtCore import Signal, Slot, QObject
 
-# Add the project root directory to Python path
-project_root = str(Path(__file__).parent.parent.parent.parent)
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
-
+from src.config import config
 from src.llm.llm_utils_adapter import LLMWorker
+from src.llm.response_cache import make_key
+
+# Content of an <original_prompt> block
+_ORIGINAL_PROMPT_RE = re.compile(r"<original_prompt>\s*(.+?)\s*</original_prompt>", re.DOTALL)
+
+# Sections of a combined critique and refine response. The closing tag of the
+# refined prompt is optional, in case the response was cut off.
+_CRITIQUE_RE = re.compile(r"<critique>\s*(.*?)\s*</critique>", re.DOTALL)
+_REFINED_PROMPT_RE = re.compile(r"<refined_prompt>\s*(.*?)\s*(?:</refined_prompt>|\Z)", re.DOTALL)
+
+# Instructions for the combined critique and refine request. Each instruction is
+# given once, here; the user prompt only carries the prompt to work on.
+_CRITIQUE_REFINE_SYSTEM_PROMPT = (
+    "You are an expert prompt engineer. Critique the given prompt, then rewrite it to fix "
+    "the weaknesses you found while keeping its original intent. "
+    "Judge clarity, specificity, structure and ambiguity.\n\n"
+    "The critique covers:\n"
+    "1. Overall assessment\n"
+    "2. Strengths\n"
+    "3. Areas for improvement\n"
+    "4. Specific suggestions\n\n"
+    "Answer in exactly this format:\n"
+    "<critique>\nYour critique\n</critique>\n"
+    "<refined_prompt>\nThe refined prompt only, without commentary\n</refined_prompt>"
+)
+
+# Instructions for the critique-only request, used when critiques come from a separate model
+_CRITIQUE_SYSTEM_PROMPT = (
+    "You are an expert prompt engineer. Critique the given prompt, judging clarity, "
+    "specificity, structure and ambiguity.\n\n"
+    "The critique covers:\n"
+    "1. Overall assessment\n"
+    "2. Strengths\n"
+    "3. Areas for improvement\n"
+    "4. Specific suggestions"
+)
+
+# Instructions for the separate refine request, used when a response lacks the refined prompt
+_REFINE_SYSTEM_PROMPT = (
+    "You are an expert prompt engineer. Rewrite the given prompt to fix the weaknesses named "
+    "in the critique while keeping its original intent. "
+    "Reply with the refined prompt only, without commentary."
+)
+
+# Runs of spaces and tabs within a line, after its indentation
+_INLINE_SPACE_RE = re.compile(r"(?<=\S)[ \t]+")
+
+def _normalize_whitespace(text: str) -> str:
+    """Collapse runs of spaces and tabs and drop trailing blanks, keeping line breaks and indentation."""
+    return "\n".join(_INLINE_SPACE_RE.sub(" ", line).rstrip() for line in text.strip().splitlines())
+
+# Refinement stops early once a refined prompt is at least this similar to its predecessor
+_CONVERGENCE_RATIO = 0.97
+
+def _has_converged(previous: str, refined: str) -> bool:
+    """Return True if the refined prompt barely differs from the previous one."""
+    matcher = SequenceMatcher(None, previous, refined)
+    # The quick ratios are upper bounds, so most clearly changed prompts are rejected cheaply
+    return (matcher.real_quick_ratio() >= _CONVERGENCE_RATIO
+            and matcher.quick_ratio() >= _CONVERGENCE_RATIO
+            and matcher.ratio() >= _CONVERGENCE_RATIO)
 
 class CritiqueNRefineWorker(QObject):
     """Worker that implements the critique and refine prompt optimization technique.
@@ -19,23 +75,37 @@ class CritiqueNRefineWorker(QObject):
     1. Generate a critique of the current prompt
     2. Use the critique to refine the prompt
     3. Return the refined prompt
+    
+    Steps 1 and 2 are done with a single LLM request per iteration, which returns
+    both the critique and the refined prompt. At temperature 0, responses are kept
+    in the on-disk response cache, so optimizing the same prompt again costs no
+    requests unless no_cache is set.
+    
+    If critique_model_name names a different model, the critique is generated by
+    that model (typically a cheaper one) and the refined prompt by model_name,
+    with two requests per iteration.
     """
     finished = Signal(str)  # Emits the refined prompt
     progress = Signal(str)  # Emits progress updates
+    token = Signal(str)     # Emits chunks of the current step's response as they are streamed
     error = Signal(str)     # Emits error messages
     cancelled = Signal()    # Emits when cancelled
     
     def __init__(self, model_name: str, user_prompt: str, system_prompt: Optional[str] = None, 
-                 iterations: int = 1, model_params: Optional[Dict[str, Any]] = None):
+                 iterations: int = 1, model_params: Optional[Dict[str, Any]] = None,
+                 no_cache: bool = False, critique_model_name: Optional[str] = None):
         super().__init__()
         self.model_name = model_name
         self.user_prompt = user_prompt
         self.system_prompt = system_prompt
         self.iterations = iterations
         self.model_params = model_params or {}
+        self.no_cache = no_cache
+        self.critique_model_name = critique_model_name or model_name
         self.cancelled_flag = False
         
         # Store references to workers to prevent premature garbage collection
+        self.critique_refine_worker = None
         self.critique_worker = None
         self.refine_worker = None
         
@@ -74,44 +144,85 @@ class CritiqueNRefineWorker(QObject):
             self.finished.emit(result)
             return
             
-        # Start the critique step
-        self.progress.emit(f"Iteration {self.current_iteration+1}/{self.iterations}: Generating critique...")
-        self._start_critique()
+        if self.critique_model_name != self.model_name:
+            # Critique and refine with separate models
+            self.progress.emit(f"Iteration {self.current_iteration+1}/{self.iterations}: Critiquing prompt...")
+            self._start_critique()
+            return
+            
+        # Start the combined critique and refine step
+        self.progress.emit(f"Iteration {self.current_iteration+1}/{self.iterations}: Critiquing and refining prompt...")
+        self._start_critique_and_refine()
     
-    def _start_critique(self):
-        """Start the critique step."""
-        critique_system_prompt = (
-            "You are an expert prompt engineer tasked with analyzing and critiquing prompts. "
-            "Your goal is to identify strengths and weaknesses in the prompt and suggest specific improvements. "
-            "Focus on clarity, specificity, structure, and potential ambiguities."
+    def _start_critique_and_refine(self):
+        """Start the critique and refine step as a single LLM request."""
+        # The fixed instructions come first and the prompt last, so that providers
+        # with prompt caching can reuse the common prefix across requests
+        critique_refine_user_prompt = f"Critique and refine this prompt:\n\n{self.prompt_content}"
+        
+        self.critique_refine_worker = self._request(
+            self.model_name,
+            _CRITIQUE_REFINE_SYSTEM_PROMPT,
+            critique_refine_user_prompt,
+            self._on_critique_and_refine_finished,
+            self._on_critique_and_refine_error
         )
+    
+    def _start_critique(self):
+        """Start a critique-only step with the critique model."""
+        critique_user_prompt = f"Critique this prompt:\n\n{self.prompt_content}"
         
-        critique_user_prompt = (
-            "Please analyze and critique the following prompt. Identify its strengths and weaknesses, "
-            "focusing on clarity, specificity, structure, and potential ambiguities. "
-            "Provide specific suggestions for improvement.\n\n"
-            f"PROMPT TO CRITIQUE:\n{self.prompt_content}\n\n"
-            "Your critique should cover:\n"
-            "1. Overall assessment\n"
-            "2. Specific strengths\n"
-            "3. Areas for improvement\n"
-            "4. Specific suggestions for enhancement"
+        self.critique_worker = self._request(
+            self.critique_model_name,
+            _CRITIQUE_SYSTEM_PROMPT,
+            critique_user_prompt,
+            self._on_critique_finished,
+            self._on_critique_and_refine_error
         )
+    
+    def _on_critique_finished(self, response):
+        """Handle the completion of the critique-only step."""
+        if self.cancelled_flag:
+            self.cancelled.emit()
+            return
+            
+        self.critique = response.strip()
+        self.progress.emit(f"Iteration {self.current_iteration+1}/{self.iterations}: Refining prompt...")
+        self._start_refine()
+    
+    def _request(self, model_name: str, system_prompt: str, user_prompt: str,
+                 on_finished, on_error) -> LLMWorker:
+        """Start an LLMWorker for a request and return it.
+        
+        The worker's runnable reads and writes the response cache in the thread pool,
+        for deterministic (temperature 0) requests only.
+        """
+        cache_key = None
+        if not self.no_cache:
+            # Prompts that differ only in spacing within lines share an entry; line
+            # breaks are kept, since a prompt's layout is part of its meaning
+            cache_key = make_key(kind="critique_refine", api=config.llm_api, model=model_name,
+                                 model_params=self.model_params, system_prompt=system_prompt,
+                                 user_prompt=_normalize_whitespace(user_prompt))
         
         # Create worker using the new LLMWorker implementation
-        self.critique_worker = LLMWorker(
-            model_name=self.model_name,
-            user_prompt=critique_user_prompt,
-            system_prompt=critique_system_prompt,
-            model_params=self.model_params
+        worker = LLMWorker(
+            model_name=model_name,
+            user_prompt=user_prompt,
+            system_prompt=system_prompt,
+            model_params=self.model_params,
+            cache_key=cache_key,
+            no_cache=self.no_cache
         )
         
         # Connect signals
-        self.critique_worker.finished.connect(self._on_critique_finished)
-        self.critique_worker.error.connect(self._on_critique_error)
+        worker.partial.connect(self.token.emit)
+        worker.finished.connect(on_finished)
+        worker.error.connect(on_error)
         
         # Run the worker
-        self.critique_worker.run()
+        worker.run()
+        return worker
     
     def _extract_prompt_content(self, prompt: str) -> str:
         """Extract the actual prompt content from the input.
@@ -119,62 +230,48 @@ class CritiqueNRefineWorker(QObject):
         If the prompt is wrapped in <original_prompt> tags, extract the content.
         Otherwise, return the prompt as is.
         """
-        # Check if the prompt is wrapped in tags
-        if "<original_prompt>" in prompt and "</original_prompt>" in prompt:
-            pattern = r"<original_prompt>\s*(.+?)\s*</original_prompt>"
-            match = re.search(pattern, prompt, re.DOTALL)
-            if match:
-                return match.group(1).strip()
-        
-        return prompt
+        match = _ORIGINAL_PROMPT_RE.search(prompt)
+        return match.group(1).strip() if match else prompt
     
-    def _on_critique_finished(self, critique):
-        """Handle the completion of the critique step."""
+    def _on_critique_and_refine_finished(self, response):
+        """Handle the completion of the combined critique and refine step."""
         if self.cancelled_flag:
             self.cancelled.emit()
             return
             
-        # Store the critique for later use
-        self.critique = critique
-        
-        # Start the refine step
-        self.progress.emit(f"Iteration {self.current_iteration+1}/{self.iterations}: Refining prompt...")
-        self._start_refine()
+        critique_match = _CRITIQUE_RE.search(response)
+        refined_match = _REFINED_PROMPT_RE.search(response)
+        if refined_match is None or not refined_match.group(1):
+            # The model didn't follow the format; use its answer as the critique
+            # and ask for the refined prompt separately
+            self.critique = critique_match.group(1) if critique_match else response.strip()
+            self.progress.emit(f"Iteration {self.current_iteration+1}/{self.iterations}: Refining prompt...")
+            self._start_refine()
+            return
+            
+        # Store the critique and continue with the refined prompt
+        self.critique = critique_match.group(1) if critique_match else ""
+        self._on_refine_finished(refined_match.group(1))
     
-    def _on_critique_error(self, error_msg):
-        """Handle errors in the critique step."""
+    def _on_critique_and_refine_error(self, error_msg):
+        """Handle errors in the critique and refine step."""
         self.error.emit(f"Error generating critique: {error_msg}")
     
     def _start_refine(self):
-        """Start the refine step."""
-        refine_system_prompt = (
-            "You are an expert prompt engineer tasked with refining and improving prompts "
-            "based on critique and analysis. Your goal is to create a clearer, more effective prompt "
-            "that addresses the weaknesses identified in the critique while maintaining the original intent."
-        )
-        
+        """Start a separate refine step for the stored critique."""
         refine_user_prompt = (
-            "Based on the critique provided, please refine and improve the original prompt. "
-            "Create a new version that addresses the weaknesses identified while maintaining the original intent.\n\n"
-            f"ORIGINAL PROMPT:\n{self.prompt_content}\n\n"
-            f"CRITIQUE:\n{self.critique}\n\n"
-            "Please provide only the refined prompt without any additional explanations or commentary."
+            "Refine this prompt based on the critique.\n\n"
+            f"PROMPT:\n{self.prompt_content}\n\n"
+            f"CRITIQUE:\n{self.critique}"
         )
         
-        # Create worker using the new LLMWorker implementation
-        self.refine_worker = LLMWorker(
-            model_name=self.model_name,
-            user_prompt=refine_user_prompt,
-            system_prompt=refine_system_prompt,
-            model_params=self.model_params
+        self.refine_worker = self._request(
+            self.model_name,
+            _REFINE_SYSTEM_PROMPT,
+            refine_user_prompt,
+            self._on_refine_finished,
+            self._on_refine_error
         )
-        
-        # Connect signals
-        self.refine_worker.finished.connect(self._on_refine_finished)
-        self.refine_worker.error.connect(self._on_refine_error)
-        
-        # Run the worker
-        self.refine_worker.run()
     
     def _on_refine_finished(self, refined_prompt):
         """Handle the completion of the refine step."""
@@ -182,11 +279,17 @@ class CritiqueNRefineWorker(QObject):
             self.cancelled.emit()
             return
             
+        # Stop iterating once refinement no longer changes the prompt materially
+        converged = _has_converged(self.prompt_content, refined_prompt)
+        
         # Update the prompt content with the refined version
         self.prompt_content = refined_prompt
         
         # Increment the iteration counter
         self.current_iteration += 1
+        if converged and self.current_iteration < self.iterations:
+            self.progress.emit(f"Prompt converged after {self.current_iteration} iteration(s), stopping early.")
+            self.current_iteration = self.iterations
         
         # Start the next iteration
         self._start_next_iteration()
@@ -9,6 +9,7 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                               QTableWidget, QTableWidgetItem, QHeaderView, 
                               QSizePolicy, QProgressDialog, QDialog)
 from PySide6.QtCore import Qt, Slot, QSettings
+from PySide6.QtGui import QTextCursor
 
 # Add the project root directory to Python path
 project_root = str(Path(__file__).parent.parent.parent.parent)
@@ -22,7 +23,8 @@ from src.config import config
 from src.utils.collapsible_panel import CollapsiblePanel
 from src.llm.special_prompts import (get_TAG_pattern_improvement_prompt,
                              get_PIC_pattern_improvement_prompt,
-                             get_LIFE_pattern_improvement_prompt)
+                             get_LIFE_pattern_improvement_prompt,
+                             wrap_original_prompt)
 from src.modules.llm_playground.critique_n_refine import CritiqueNRefineWorker
 from src.modules.llm_playground.critique_config_dialog import CritiqueRefineConfigDialog
 
@@ -44,6 +46,7 @@ class LLMPlaygroundWidget(QWidget):
         
         # Initialize worker-related variables
         self.worker = None
+        self._streaming_started = False  # Whether the current response has started streaming in
         self.progress_dialog = None
         
         # Update models for current API
@@ -223,6 +226,13 @@ class LLMPlaygroundWidget(QWidget):
         top_p_layout.addWidget(self.top_p_combo)
         params_content_layout.addLayout(top_p_layout)
         
+        # Response cache bypass (temperature 0 responses are otherwise reused)
+        self.no_cache_checkbox = QCheckBox("Skip response cache")
+        self.no_cache_checkbox.setToolTip(
+            "Always ask the model, even if a cached response for this request exists"
+        )
+        params_content_layout.addWidget(self.no_cache_checkbox)
+        
         # Separator
         self.variables_separator = QFrame()
         self.variables_separator.setFrameShape(QFrame.HLine)
@@ -433,11 +443,13 @@ class LLMPlaygroundWidget(QWidget):
                 model_name=model,
                 user_prompt=processed_user_prompt,
                 system_prompt=processed_system_prompt,
-                model_params=model_params
+                model_params=model_params,
+                no_cache=self.no_cache_checkbox.isChecked()
             )
             
             # Connect signals
             self.worker.finished.connect(self.on_llm_finished)
+            self.worker.partial.connect(self.on_llm_partial)
             self.worker.error.connect(self.on_llm_error)
             self.worker.cancelled.connect(self.on_llm_cancelled)
             
@@ -445,6 +457,7 @@ class LLMPlaygroundWidget(QWidget):
             self.progress_dialog.canceled.connect(self.on_cancel_clicked)
             
             # Run the worker
+            self._streaming_started = False
             self.worker.run()
             
         except Exception as e:
@@ -452,6 +465,15 @@ class LLMPlaygroundWidget(QWidget):
             self.save_as_prompt_button.setEnabled(False)  # Disable button on error
             self.show_status(f"Error: {str(e)}", 7000)
 
+    @Slot(str)
+    def on_llm_partial(self, chunk: str):
+        """Append a streamed chunk of the LLM response to the output."""
+        if not self._streaming_started:
+            self._streaming_started = True
+            self.playground_output.clear()
+        self.playground_output.moveCursor(QTextCursor.End)
+        self.playground_output.insertPlainText(chunk)
+
     @Slot(str)
     def on_llm_finished(self, result: str):
         """Called when the LLM request finishes without cancellation."""
@@ -526,11 +548,7 @@ class LLMPlaygroundWidget(QWidget):
             pattern_prompt = self.prompt_patterns["TAG"] if pattern not in self.prompt_patterns else self.prompt_patterns[pattern]
             
             # Combine system and user prompts if system prompt exists and is visible
-            overall_prompt = f"<original_prompt>\n User: {user_prompt}\n</original_prompt>"
-            if self.system_prompt_checkbox.isChecked() and self.system_prompt.isVisible():
-                system_prompt = self.system_prompt.toPlainText()
-                if system_prompt.strip():
-                    overall_prompt = f"<original_prompt>\nSystem: {system_prompt}\n\nUser: {user_prompt}\n</original_prompt>"
+            overall_prompt = wrap_original_prompt(user_prompt, self._visible_system_prompt())
             
             # Show progress dialog and status
             self.progress_dialog = QProgressDialog("Improving prompt...", "Cancel", 0, 0, self)
@@ -745,6 +763,14 @@ class LLMPlaygroundWidget(QWidget):
         var_name = self.variables_table.item(item.row(), 0).text()
         self.current_variables[var_name] = item.text()
         
+    def _visible_system_prompt(self) -> Optional[str]:
+        """Return the system prompt if it is enabled, visible and not blank, else None."""
+        if self.system_prompt_checkbox.isChecked() and self.system_prompt.isVisible():
+            system_prompt = self.system_prompt.toPlainText()
+            if system_prompt.strip():
+                return system_prompt
+        return None
+
     def get_processed_prompt(self, text):
         """Replace template variables in text with their values."""
         processed = text
@@ -782,18 +808,16 @@ class LLMPlaygroundWidget(QWidget):
             
         try:
             # Configure the critique and refine process
-            dialog = CritiqueRefineConfigDialog(self)
+            models = [self.model_combo.itemText(i) for i in range(self.model_combo.count())]
+            dialog = CritiqueRefineConfigDialog(self, models=models, current_model=model)
             if dialog.exec() != QDialog.Accepted:
                 return
                 
             iterations = dialog.get_iterations()
+            critique_model = dialog.get_critique_model()
             
             # Combine system and user prompts if system prompt exists and is visible
-            overall_prompt = f"<original_prompt>\n User: {user_prompt}\n</original_prompt>"
-            if self.system_prompt_checkbox.isChecked() and self.system_prompt.isVisible():
-                system_prompt = self.system_prompt.toPlainText()
-                if system_prompt.strip():
-                    overall_prompt = f"<original_prompt>\nSystem: {system_prompt}\n\nUser: {user_prompt}\n</original_prompt>"
+            overall_prompt = wrap_original_prompt(user_prompt, self._visible_system_prompt())
             
             # Show progress dialog and status
             self.progress_dialog = QProgressDialog("Optimizing prompt...", "Cancel", 0, 0, self)
@@ -816,7 +840,9 @@ class LLMPlaygroundWidget(QWidget):
                 user_prompt=overall_prompt,
                 system_prompt=None,  # System prompt is included in the overall prompt
                 iterations=iterations,
-                model_params=model_params
+                model_params=model_params,
+                no_cache=self.no_cache_checkbox.isChecked(),
+                critique_model_name=critique_model
             )
             
             # Connect signals
@@ -824,6 +850,7 @@ class LLMPlaygroundWidget(QWidget):
             self.worker.error.connect(self.on_critique_refine_error)
             self.worker.cancelled.connect(self.on_critique_refine_cancelled)
             self.worker.progress.connect(self.on_critique_refine_progress)
+            self.worker.token.connect(self.on_llm_partial)
             
             # Handle cancellation
             self.progress_dialog.canceled.connect(self.on_cancel_clicked)
@@ -870,6 +897,8 @@ class LLMPlaygroundWidget(QWidget):
         """Update progress dialog with current status."""
         if self.progress_dialog:
             self.progress_dialog.setLabelText(message)
+        # Each step streams its own response into the output
+        self._streaming_started = False
             
 
 
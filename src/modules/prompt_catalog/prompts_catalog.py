@@ -1,10 +1,11 @@
 from pathlib import Path
 import sys
+import bisect
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                               QLineEdit, QTextEdit, QComboBox, QListWidget,
                               QLabel, QFrame, QListWidgetItem, QCheckBox,
                               QMenu, QMessageBox, QSplitter)
-from PySide6.QtCore import Qt, Signal, Slot
+from PySide6.QtCore import Qt, Signal, Slot, QTimer, QSignalBlocker, QPoint
 from datetime import datetime
 
 # Add the project root directory to Python path
@@ -16,14 +17,43 @@ from src.storage.models import Prompt, PromptType
 from src.utils.collapsible_panel import CollapsiblePanel
 from src.utils.expandable_text import ExpandableTextWidget
 
+# Stylesheet for the whole catalog, applied once at the widget root
+_CATALOG_QSS = """
+    QFrame#searchListFrame, QFrame#searchListFrame QFrame {
+        border: 1px solid #CCCCCC;
+        padding: 6px;
+    }
+    QFrame#searchListFrame QLineEdit, QFrame#searchListFrame QListWidget,
+    QTextEdit#systemPromptEdit, QTextEdit#userPromptEdit {
+        background: #F5F5F5;
+        border: 1px solid #CCCCCC;
+    }
+    QFrame#searchListFrame QLabel {
+        border: none;
+        background: transparent;
+    }
+    QLineEdit#searchBox { padding: 8px; }
+    QTextEdit#systemPromptEdit, QTextEdit#userPromptEdit { padding: 16px; }
+    QListWidget#promptList::item:hover, QListWidget#promptList::item:selected { background: #BBBBBB; }
+"""
+
 class PromptsCatalogWidget(QWidget):
     prompt_selected_for_eval = Signal(QListWidgetItem, QListWidgetItem)
 
+    # Editor splitter sizes (system, user) with the system prompt expanded or normal
+    _SIZES_EXPANDED = [1800, 200]
+    _SIZES_NORMAL = [400, 600]
+
     def __init__(self, storage, settings, parent=None):
         super().__init__(parent)
         self.storage = storage
         self.settings = settings
         self._prompts = []
+        self._prompt_by_id = {}  # Prompt id -> Prompt, the id is stored on each list item
+        self._titles_lower = []  # Lowercased titles, parallel to _prompts, for filtering
+        self._items = []  # List items, parallel to _prompts, to avoid per-row item() lookups
+        self._last_search = ""  # Search text the list is currently filtered by
+        self._visible_indices = set()  # Rows not hidden by the current filter
         self.current_prompt = None
         self.system_prompt_visible = self.settings.value("system_prompt_visible", False, bool)
         self.setup_ui()
@@ -59,39 +89,27 @@ class PromptsCatalogWidget(QWidget):
         editor_layout.addLayout(system_prompt_header)
         
         # Create vertical splitter for system and user prompts
-        editor_splitter = QSplitter(Qt.Vertical)
+        self.editor_splitter = QSplitter(Qt.Vertical)
         
         # System prompt editor
         self.system_prompt = ExpandableTextWidget()
         self.system_prompt.setVisible(self.system_prompt_visible)
         self.system_prompt.setMinimumHeight(120)  # Initial height
-        self.system_prompt.setStyleSheet("""
-            QTextEdit {
-                padding: 16px;  
-                background: #F5F5F5;
-                border: 1px solid #CCCCCC;
-            }
-        """)
+        self.system_prompt.setObjectName("systemPromptEdit")
         self.system_prompt.setPlaceholderText("Enter an optional system prompt...")
         
         # User prompt editor
         self.user_prompt = QTextEdit()
         self.user_prompt.setMinimumHeight(180)
-        self.user_prompt.setStyleSheet("""
-            QTextEdit {
-                padding: 16px;  
-                background: #F5F5F5;
-                border: 1px solid #CCCCCC;
-            }
-        """)
+        self.user_prompt.setObjectName("userPromptEdit")
         self.user_prompt.setPlaceholderText("Enter your prompt here...")
         
         # Add editors to splitter
-        editor_splitter.addWidget(self.system_prompt)
-        editor_splitter.addWidget(self.user_prompt)
+        self.editor_splitter.addWidget(self.system_prompt)
+        self.editor_splitter.addWidget(self.user_prompt)
         
         # Set initial sizes (40% system, 60% user)
-        editor_splitter.setSizes([400, 600])
+        self.editor_splitter.setSizes(self._SIZES_NORMAL)
         
         # Store original heights for restoration
         self.original_heights = {
@@ -100,12 +118,10 @@ class PromptsCatalogWidget(QWidget):
         }
         
         # Connect expandable widget signals
-        self.system_prompt.expandedChanged.connect(lambda expanded: self.toggle_compact_mode(expanded) if self.system_prompt.isVisible() else None)
-        self.system_prompt.sizeChanged.connect(lambda: editor_splitter.setSizes(
-            [1800, 200] if self.system_prompt.is_expanded and self.system_prompt.isVisible() else [400, 600]
-        ))
+        self.system_prompt.expandedChanged.connect(self._on_system_expanded)
+        self.system_prompt.sizeChanged.connect(self._on_system_size_changed)
         
-        editor_layout.addWidget(editor_splitter)
+        editor_layout.addWidget(self.editor_splitter)
         
         # Save button
         save_btn = QPushButton("Save")
@@ -121,20 +137,7 @@ class PromptsCatalogWidget(QWidget):
         # Create a frame for search and list controls
         search_list_frame = QFrame()
         search_list_frame.setFrameStyle(QFrame.StyledPanel)
-        search_list_frame.setStyleSheet("""
-            QFrame { 
-                border: 1px solid #CCCCCC; 
-                padding: 6px; 
-            }
-            QLineEdit, QListWidget { 
-                background: #F5F5F5;
-                border: 1px solid #CCCCCC;
-            }
-            QLabel { 
-                border: none;
-                background: transparent;
-            }
-        """)
+        search_list_frame.setObjectName("searchListFrame")
         search_list_layout = QVBoxLayout(search_list_frame)
         search_list_layout.setSpacing(12)
         
@@ -144,14 +147,13 @@ class PromptsCatalogWidget(QWidget):
         
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText("Search prompts...")
-        self.search_box.setStyleSheet("""
-            QLineEdit {
-                padding: 8px;
-                background: #F5F5F5;
-                border: 1px solid #CCCCCC;
-            }
-        """)
-        self.search_box.textChanged.connect(self.filter_prompts)
+        self.search_box.setObjectName("searchBox")
+        # Debounce filtering so fast typing results in a single pass
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(120)
+        self._filter_timer.timeout.connect(self.filter_prompts)
+        self.search_box.textChanged.connect(self._filter_timer.start)
         search_list_layout.addWidget(self.search_box)
 
         # Prompt list with label
@@ -159,17 +161,11 @@ class PromptsCatalogWidget(QWidget):
         search_list_layout.addWidget(prompts_label)
         
         self.prompt_list = QListWidget()
+        self.prompt_list.setUniformItemSizes(True)  # All rows are single-line titles
         self.prompt_list.currentItemChanged.connect(self.on_prompt_selected)
         self.prompt_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.prompt_list.customContextMenuRequested.connect(self.show_context_menu)
-        self.prompt_list.setStyleSheet("""
-            QListWidget {
-                background: #F5F5F5;
-                border: 1px solid #CCCCCC;
-            }
-            QListWidget::item:hover { background: #BBBBBB; }
-            QListWidget::item:selected { background: #BBBBBB; }
-        """)
+        self.prompt_list.setObjectName("promptList")
         search_list_layout.addWidget(self.prompt_list)
         
         self.prompts_panel.content_layout.addWidget(search_list_frame)
@@ -185,6 +181,9 @@ class PromptsCatalogWidget(QWidget):
         catalog_layout.setStretch(1, 0)
         catalog_layout.setSpacing(16)  # Consistent spacing
 
+        # Style all child widgets with a single stylesheet parse
+        self.setStyleSheet(_CATALOG_QSS)
+
     def save_state(self):
         self.settings.setValue("prompts_panel_expanded", self.prompts_panel.expanded)
         self.settings.setValue("system_prompt_visible", self.system_prompt_visible)
@@ -216,38 +215,119 @@ class PromptsCatalogWidget(QWidget):
             id=self.current_prompt.id if self.current_prompt else ""
         )
         self.storage.save_prompt(prompt, old_type)
-        self.load_prompts()
+
+        # Update the affected row in place instead of reloading the whole catalog.
+        # The editor already shows the saved prompt, so selecting its row must not
+        # trigger on_prompt_selected; the playground is notified once below.
+        blocker = QSignalBlocker(self.prompt_list)
+        row = self._upsert_prompt_item(prompt)
+        self.prompt_list.setCurrentRow(row)
+        blocker.unblock()
+
+        self.current_prompt = prompt
+        self.prompt_selected_for_eval.emit(self._items[row], None)
+
+    def _upsert_prompt_item(self, prompt) -> int:
+        """Add or update the list item for a saved prompt and return its row."""
+        old_prompt = self._prompt_by_id.get(prompt.id)
+        if old_prompt is None:
+            return self._insert_row(prompt)
+
+        row = self._row_of(old_prompt)
+        if old_prompt.title.lower() != prompt.title.lower():
+            # The title moved in sort order, so the row has to move too
+            self._remove_row(row)
+            return self._insert_row(prompt)
+
+        self._prompts[row] = prompt
+        self._prompt_by_id[prompt.id] = prompt
+        self._items[row].setText(prompt.title)
+        return row
+
+    def _remove_prompt_item(self, prompt):
+        """Remove the list item of a deleted prompt."""
+        self._remove_row(self._row_of(prompt))
+
+    def _insert_row(self, prompt) -> int:
+        """Insert a prompt at its sorted position and return its row."""
+        title_lower = prompt.title.lower()
+        row = bisect.bisect_right(self._titles_lower, title_lower)
+        self._prompts.insert(row, prompt)
+        self._prompt_by_id[prompt.id] = prompt
+        self._titles_lower.insert(row, title_lower)
+
+        item = QListWidgetItem(prompt.title)
+        hidden = self._last_search not in title_lower
+        item.setData(Qt.UserRole, prompt.id)
+        item.setHidden(hidden)
+        self.prompt_list.insertItem(row, item)
+        self._items.insert(row, item)
+        self._visible_indices = {i + 1 if i >= row else i for i in self._visible_indices}
+        if not hidden:
+            self._visible_indices.add(row)
+        return row
+
+    def _remove_row(self, row: int):
+        """Remove the prompt at the given row from the list and the model."""
+        self.prompt_list.takeItem(row)
+        del self._prompt_by_id[self._prompts[row].id]
+        del self._prompts[row]
+        del self._titles_lower[row]
+        del self._items[row]
+        self._visible_indices.discard(row)
+        self._visible_indices = {i - 1 if i > row else i for i in self._visible_indices}
+
+    def _row_of(self, prompt) -> int:
+        """Return the row of a listed prompt, located by its title."""
+        row = bisect.bisect_left(self._titles_lower, prompt.title.lower())
+        while row < len(self._prompts) and self._titles_lower[row] == prompt.title.lower():
+            if self._prompts[row] is prompt:
+                return row
+            row += 1
+        return self._prompts.index(prompt)  # List was not in title order
 
     def load_prompts(self):
-        # Store the current prompt's title before clearing
-        current_title = self.current_prompt.title if self.current_prompt else None
+        # Store the current prompt's id before clearing
+        current_id = self.current_prompt.id if self.current_prompt else None
         
+        # Rebuild without per-item repaints or selection signals
+        self.prompt_list.setUpdatesEnabled(False)
+        blocker = QSignalBlocker(self.prompt_list)
         self.prompt_list.clear()
         self._prompts = self.storage.get_all_prompts()
+        self._titles_lower = [p.title.lower() for p in self._prompts]
+        self._prompt_by_id = {p.id: p for p in self._prompts}
+        self._last_search = ""
+        self._visible_indices = set(range(len(self._prompts)))
         
-        selected_index = 0  # Default to first item
-        for i, prompt in enumerate(self._prompts):
+        self._items = []
+        for prompt in self._prompts:
             item = QListWidgetItem(prompt.title)
-            item.setData(Qt.UserRole, i)  # Store the index in the _prompts list
+            item.setData(Qt.UserRole, prompt.id)  # Look prompts up by id, not position
             self.prompt_list.addItem(item)
-            
-            # If this is the previously selected prompt, store its index
-            if current_title and prompt.title == current_title:
-                selected_index = i
+            self._items.append(item)
+
+        # Reselect the previously selected prompt, defaulting to the first item
+        previous_prompt = self._prompt_by_id.get(current_id)
+        selected_index = self._row_of(previous_prompt) if previous_prompt is not None else 0
         
         # Select the appropriate prompt
         if self.prompt_list.count() > 0:
-            self.prompt_list.setCurrentRow(selected_index)  # This will trigger on_prompt_selected
-            # Emit signal for initial selection to sync with playground
-            current_item = self.prompt_list.item(selected_index)
-            self.prompt_selected_for_eval.emit(current_item, None)
+            self.prompt_list.setCurrentRow(selected_index)
 
-    @Slot()
+        blocker.unblock()
+        self.prompt_list.setUpdatesEnabled(True)
+
+        # Sync the editor and the playground with the selection once
+        current_item = self.prompt_list.currentItem()
+        if current_item is not None:
+            self.on_prompt_selected(current_item, None)
+
+    @Slot(QListWidgetItem, QListWidgetItem)
     def on_prompt_selected(self, current, previous):
         if current:
-            index = current.data(Qt.UserRole)
-            if index is not None and 0 <= index < len(self._prompts):
-                selected_prompt = self._prompts[index]
+            selected_prompt = self._prompt_by_id.get(current.data(Qt.UserRole))
+            if selected_prompt is not None:
                 self.current_prompt = selected_prompt
                 self.title_edit.setText(selected_prompt.title)
                 self.user_prompt.setPlainText(selected_prompt.user_prompt)
@@ -266,38 +346,89 @@ class PromptsCatalogWidget(QWidget):
     @Slot()
     def filter_prompts(self):
         search_text = self.search_box.text().lower()
-        for i in range(self.prompt_list.count()):
-            item = self.prompt_list.item(i)
-            item.setHidden(search_text not in item.text().lower())
+        last_search = self._last_search
+        titles_lower = self._titles_lower
+        items = self._items
+
+        if not search_text:
+            # Cleared search: unhide whatever is hidden without matching titles
+            all_rows = set(range(len(titles_lower)))
+            for i in all_rows - self._visible_indices:
+                items[i].setHidden(False)
+            self._visible_indices = all_rows
+        elif search_text.startswith(last_search):
+            # Narrowing: only currently visible rows can become hidden
+            for i in [i for i in self._visible_indices if search_text not in titles_lower[i]]:
+                items[i].setHidden(True)
+                self._visible_indices.discard(i)
+        elif last_search.startswith(search_text):
+            # Widening: only currently hidden rows can become visible
+            for i, title_lower in enumerate(titles_lower):
+                if i not in self._visible_indices and search_text in title_lower:
+                    items[i].setHidden(False)
+                    self._visible_indices.add(i)
+        else:
+            # Unrelated search: re-check every row but only touch rows that flip
+            visible = set()
+            for i, title_lower in enumerate(titles_lower):
+                shown = search_text in title_lower
+                if shown:
+                    visible.add(i)
+                if shown != (i in self._visible_indices):
+                    items[i].setHidden(not shown)
+            self._visible_indices = visible
+
+        self._last_search = search_text
 
     @Slot()
     def toggle_system_prompt(self):
         """Toggle system prompt visibility and adjust UI accordingly."""
         self.system_prompt_visible = self.system_prompt_checkbox.isChecked()
+
+        # Apply the visibility and height changes as one repaint of the editors
+        self.editor_splitter.setUpdatesEnabled(False)
         self.system_prompt.setVisible(self.system_prompt_visible)
         
         # Reset compact mode when hiding system prompt
         if not self.system_prompt_visible and self.system_prompt.is_expanded:
             self.toggle_compact_mode(False)
+        self.editor_splitter.setUpdatesEnabled(True)
+
+    @Slot(bool)
+    def _on_system_expanded(self, expanded: bool):
+        """Switch compact mode when the visible system prompt is expanded or collapsed."""
+        if self.system_prompt.isVisible():
+            self.toggle_compact_mode(expanded)
 
     @Slot()
+    def _on_system_size_changed(self):
+        """Give the expanded system prompt most of the editor splitter."""
+        expanded = self.system_prompt.is_expanded and self.system_prompt.isVisible()
+        self.editor_splitter.setSizes(self._SIZES_EXPANDED if expanded else self._SIZES_NORMAL)
+
+    @Slot(bool)
     def toggle_compact_mode(self, expanded):
         """Toggle between compact and normal mode for the user prompt"""
+        self.user_prompt.setUpdatesEnabled(False)
         if expanded:
             # Compact mode for user prompt
             self.user_prompt.setMinimumHeight(40)
             self.user_prompt.setMaximumHeight(60)
             
             # Update placeholder for better visibility in compact mode
-            if self.user_prompt.toPlainText():
-                self.user_prompt.setPlaceholderText("User: " + self.user_prompt.toPlainText()[:50] + "...")
+            user_text = self.user_prompt.toPlainText()
+            if user_text:
+                placeholder = "User: " + user_text[:50] + "..."
+                if placeholder != self.user_prompt.placeholderText():
+                    self.user_prompt.setPlaceholderText(placeholder)
         else:
             # Normal mode
             self.user_prompt.setMinimumHeight(self.original_heights['user_prompt'])
             self.user_prompt.setMaximumHeight(16777215)  # Qt's QWIDGETSIZE_MAX
             self.user_prompt.setPlaceholderText("Enter your prompt here...")
+        self.user_prompt.setUpdatesEnabled(True)
 
-    @Slot()
+    @Slot(QPoint)
     def show_context_menu(self, position):
         item = self.prompt_list.itemAt(position)
         if not item:
@@ -310,23 +441,35 @@ class PromptsCatalogWidget(QWidget):
         if action == delete_action:
             self.delete_prompt(item)
             
+    @Slot(QListWidgetItem)
     def delete_prompt(self, item):
-        index = item.data(Qt.UserRole)
-        if index is None or index >= len(self._prompts):
+        prompt = self._prompt_by_id.get(item.data(Qt.UserRole))
+        if prompt is None:
             return
-            
-        prompt = self._prompts[index]
-        reply = QMessageBox.question(
-            self,
-            "Delete Prompt",
-            f"Are you sure you want to delete the prompt '{prompt.title}'?",
-            QMessageBox.Yes | QMessageBox.No,
-            QMessageBox.No
+
+        # Ask without blocking so timers and other widgets keep running
+        box = QMessageBox(self)
+        box.setAttribute(Qt.WA_DeleteOnClose)
+        box.setIcon(QMessageBox.Question)
+        box.setWindowTitle("Delete Prompt")
+        box.setText(f"Are you sure you want to delete the prompt '{prompt.title}'?")
+        box.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+        box.setDefaultButton(QMessageBox.No)
+        box.finished.connect(
+            lambda _: self._do_delete(prompt.id)
+            if box.standardButton(box.clickedButton()) == QMessageBox.Yes else None
         )
-        
-        if reply == QMessageBox.Yes:
-            self.storage.delete_prompt(prompt.id, prompt.prompt_type)
-            self.load_prompts()
-            # Clear editor if the deleted prompt was selected
-            if self.current_prompt and self.current_prompt.id == prompt.id:
-                self.create_new_prompt()
\ No newline at end of file
+        box.open()
+
+    def _do_delete(self, prompt_id: str):
+        """Delete a confirmed prompt from storage and the list."""
+        prompt = self._prompt_by_id.get(prompt_id)
+        if prompt is None:
+            return
+
+        was_selected = self.current_prompt is not None and self.current_prompt.id == prompt.id
+        self.storage.delete_prompt(prompt.id, prompt.prompt_type)
+        self._remove_prompt_item(prompt)
+        # Clear editor if the deleted prompt was selected
+        if was_selected:
+            self.create_new_prompt()
\ No newline at end of file
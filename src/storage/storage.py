@@ -21,6 +21,7 @@ logger = logging.getLogger(__name__)
 class FileStorage:
     def __init__(self, base_dir: str = "prompts"):
         self.base_dir = Path(base_dir)
+        self._prompts_cache: Optional[List[Prompt]] = None  # Sorted prompts, reset on every write
         self._init_storage()
 
     def _init_storage(self):
@@ -41,6 +42,7 @@ class FileStorage:
         if not prompt.id:
             prompt.id = str(uuid.uuid4())
             logger.info("Generated new UUID for prompt: %s", prompt.id)
+        self._prompts_cache = None
         
         # If we have an old type and it's different from current type, delete the old file
         if old_type and old_type != prompt.prompt_type:
@@ -71,15 +73,21 @@ class FileStorage:
             return Prompt.from_dict(json.load(f))
 
     def get_all_prompts(self) -> List[Prompt]:
+        # Serve repeat reads from memory until the next save or delete
+        if self._prompts_cache is not None:
+            return list(self._prompts_cache)
+
         prompts = []
         for prompt_type in PromptType:
             type_dir = self.base_dir / prompt_type.name.lower()
             for prompt_file in type_dir.glob("*.json"):
                 with prompt_file.open('r') as f:
                     prompts.append(Prompt.from_dict(json.load(f)))
-        return sorted(prompts, key=lambda p: p.title.lower())  # Sort case-insensitive by title
+        self._prompts_cache = sorted(prompts, key=lambda p: p.title.lower())  # Sort case-insensitive by title
+        return list(self._prompts_cache)
 
     def delete_prompt(self, prompt_id: str, prompt_type: PromptType):
+        self._prompts_cache = None
         type_dir = self.base_dir / prompt_type.name.lower()
         # Look for any file ending with the prompt_id
         matching_files = list(type_dir.glob(f"*_{prompt_id}.json"))
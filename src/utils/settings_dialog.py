@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, 
-                               QLabel, QComboBox, QPushButton)
+                               QLabel, QComboBox, QPushButton, QSpinBox)
 from PySide6.QtCore import Signal, Slot
 from pathlib import Path
 import sys
@@ -10,6 +10,8 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from src.config import config
+from src.llm.llm_utils_adapter import LLMWorker
+from src.utils.thread_manager import ThreadManager
 
 class SettingsDialog(QDialog):
     api_changed = Signal(str)  # Signal to emit when API changes
@@ -28,12 +30,8 @@ class SettingsDialog(QDialog):
         self.api_combo = QComboBox()
         self.api_combo.addItem("llm cmdline tool", "llm-cmd")
         self.api_combo.addItem("LiteLLM library", "litellm")
-        
-        # Set current value from config
-        current_api = config.llm_api
-        index = self.api_combo.findData(current_api)
-        if index >= 0:
-            self.api_combo.setCurrentIndex(index)
+        # Combo index per API value, so selecting one doesn't search the combo
+        self._api_index = {self.api_combo.itemData(i): i for i in range(self.api_combo.count())}
             
         api_layout.addWidget(api_label)
         api_layout.addWidget(self.api_combo)
@@ -44,16 +42,31 @@ class SettingsDialog(QDialog):
         log_label = QLabel("Logging Level:")
         self.log_combo = QComboBox()
         self.log_combo.addItems(["Info", "Warning", "Error"])
-        
-        # Set current value from config
-        current_level = config.log_level
-        index = self.log_combo.findText(current_level)
-        if index >= 0:
-            self.log_combo.setCurrentIndex(index)
+        self._log_index = {self.log_combo.itemText(i): i for i in range(self.log_combo.count())}
             
         log_layout.addWidget(log_label)
         log_layout.addWidget(self.log_combo)
         layout.addLayout(log_layout)
+
+        # Concurrency limits
+        llm_concurrency_layout = QHBoxLayout()
+        llm_concurrency_label = QLabel("Parallel LLM requests:")
+        self.llm_concurrency_spin = QSpinBox()
+        self.llm_concurrency_spin.setRange(1, 32)
+        llm_concurrency_layout.addWidget(llm_concurrency_label)
+        llm_concurrency_layout.addWidget(self.llm_concurrency_spin)
+        layout.addLayout(llm_concurrency_layout)
+
+        embed_concurrency_layout = QHBoxLayout()
+        embed_concurrency_label = QLabel("Parallel embedding requests:")
+        self.embed_concurrency_spin = QSpinBox()
+        self.embed_concurrency_spin.setRange(1, 32)
+        embed_concurrency_layout.addWidget(embed_concurrency_label)
+        embed_concurrency_layout.addWidget(self.embed_concurrency_spin)
+        layout.addLayout(embed_concurrency_layout)
+
+        # Set current values from config
+        self._select_current_settings()
         
         # Buttons
         button_layout = QHBoxLayout()
@@ -78,12 +91,21 @@ class SettingsDialog(QDialog):
         new_api = self.api_combo.currentData()
         if new_api != config.llm_api:
             config.llm_api = new_api
+            LLMWorker.invalidate_models_cache()
             self.api_changed.emit(new_api)
             
         # Save logging level setting
         new_level = self.log_combo.currentText()
         if new_level != config.log_level:
             config.log_level = new_level
+
+        # Save concurrency limits
+        llm_concurrency = self.llm_concurrency_spin.value()
+        embed_concurrency = self.embed_concurrency_spin.value()
+        if (llm_concurrency, embed_concurrency) != (config.llm_concurrency, config.embed_concurrency):
+            config.llm_concurrency = llm_concurrency
+            config.embed_concurrency = embed_concurrency
+            ThreadManager.instance().apply_concurrency_limits()
             
         self.accept()
         
@@ -91,9 +113,17 @@ class SettingsDialog(QDialog):
     def reset_settings(self):
         config.reset_llm_api()
         config.reset_log_level()
-        index = self.api_combo.findData(config.llm_api)
-        if index >= 0:
+        config.reset_concurrency()
+        ThreadManager.instance().apply_concurrency_limits()
+        self._select_current_settings()
+
+    def _select_current_settings(self):
+        """Show the configured API, logging level and concurrency limits."""
+        index = self._api_index.get(config.llm_api)
+        if index is not None:
             self.api_combo.setCurrentIndex(index)
-        index = self.log_combo.findText(config.log_level)
-        if index >= 0:
+        index = self._log_index.get(config.log_level)
+        if index is not None:
             self.log_combo.setCurrentIndex(index)
+        self.llm_concurrency_spin.setValue(config.llm_concurrency)
+        self.embed_concurrency_spin.setValue(config.embed_concurrency)
@@ -1,7 +1,7 @@
 # thread_manager.py
 import logging
 from typing import Callable, Any, Dict, Optional
-from PySide6.QtCore import QObject, Signal, QRunnable, QThreadPool, Qt
+from PySide6.QtCore import QObject, Signal, QRunnable, QThreadPool, QDeadlineTimer, Qt
 
 logging.debug('thread_manager module imported.')
 
@@ -15,6 +15,7 @@ class WorkerSignals(QObject):
     finished = Signal(object)  # Signal emitted when the worker completes with a result
     error = Signal(str)       # Signal emitted when an error occurs
     progress = Signal(int)    # Signal emitted to report progress
+    partial = Signal(str)     # Signal emitted with each chunk of a streamed result
     cancelled = Signal()      # Signal emitted when the worker is cancelled
 
 class BaseRunnable(QRunnable):
@@ -50,7 +51,9 @@ class ThreadManager:
     Manages a global thread pool for the application.
     
     This class provides a centralized interface for submitting tasks to
-    a thread pool and managing thread execution.
+    a thread pool and managing thread execution. LLM and embedding requests
+    run in their own pools, so a burst of one kind cannot starve the other
+    and each gets a concurrency limit that can match the provider's rate limits.
     """
     _instance = None
     
@@ -68,16 +71,29 @@ class ThreadManager:
         Initialize the thread manager with the global thread pool.
         """
         self.thread_pool = QThreadPool.globalInstance()
+        self.llm_pool = QThreadPool()
+        self.embed_pool = QThreadPool()
+        self._pools = {"llm": self.llm_pool, "embed": self.embed_pool}
+        self.apply_concurrency_limits()
         self.active_runnables = []  # Keep track of active runnables for cleanup
         logging.debug(f"ThreadManager initialized with {self.thread_pool.maxThreadCount()} threads")
     
-    def start_runnable(self, runnable: BaseRunnable, priority: int = 0):
+    def apply_concurrency_limits(self):
+        """
+        Size the LLM and embedding pools from the configured concurrency limits.
+        """
+        from src.config import config
+        self.llm_pool.setMaxThreadCount(config.llm_concurrency)
+        self.embed_pool.setMaxThreadCount(config.embed_concurrency)
+    
+    def start_runnable(self, runnable: BaseRunnable, priority: int = 0, kind: Optional[str] = None):
         """
         Submit a runnable to the thread pool.
         
         Args:
             runnable: The BaseRunnable to execute
             priority: The priority of the task (higher values = higher priority)
+            kind: 'llm' or 'embed' to run in that workload's pool; None for the global pool
         """
         # Keep track of the runnable for cleanup
         self.active_runnables.append(runnable)
@@ -89,7 +105,7 @@ class ThreadManager:
         
         # Set the priority and start the runnable
         runnable.setAutoDelete(False)  # We'll handle deletion ourselves
-        self.thread_pool.start(runnable, priority)
+        self._pools.get(kind, self.thread_pool).start(runnable, priority)
     
     def _cleanup_runnable(self, runnable):
         """
@@ -115,7 +131,9 @@ class ThreadManager:
         Returns:
             True if all tasks completed, False if timed out
         """
-        return self.thread_pool.waitForDone(msecs)
+        deadline = QDeadlineTimer(QDeadlineTimer.Forever if msecs < 0 else msecs)
+        return all([pool.waitForDone(deadline)
+                    for pool in (self.thread_pool, self.llm_pool, self.embed_pool)])
     
     def cleanup(self):
         """
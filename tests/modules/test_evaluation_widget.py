@@ -1,4 +1,5 @@
 import pytest
+import io
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 import sys
@@ -6,6 +7,7 @@ from datetime import datetime
 from PySide6.QtWidgets import QApplication, QTableWidgetItem, QMessageBox, QPushButton
 from PySide6.QtCore import Qt, QSettings, Signal, QObject
 import numpy as np
+import markdown
 
 # Add the project root directory to Python path
 project_root = str(Path(__file__).parent.parent.parent)
@@ -15,7 +17,7 @@ if project_root not in sys.path:
 from src.modules.eval_playground.evaluation_widget import EvaluationWidget
 from src.storage.models import TestSet, TestCase
 from src.modules.eval_playground.output_analyzer import AnalysisResult, OutputAnalyzer
-from src.modules.eval_playground.html_eval_report import HtmlEvalReport
+from src.modules.eval_playground.html_eval_report import HtmlEvalReport, _markdown_to_html
 
 @pytest.fixture
 def evaluation_widget(qtbot, qapp):
@@ -119,6 +121,36 @@ def test_export_results(qtbot, evaluation_widget, tmp_path):
         assert 'expected output' in content
         assert 'actual output' in content
 
+def test_report_to_writer_matches_report_string():
+    """Test that streaming the report writes the same document as generate_report."""
+    results = [
+        AnalysisResult(
+            input_text='**input**',
+            baseline_output='baseline',
+            current_output='current',
+            similarity_score=0.5,
+            llm_grade='👍',
+            llm_feedback='',
+            key_changes=[]
+        )
+    ]
+    metadata = {'test_set_name': 'set', 'baseline_system_prompt': 'a', 'new_system_prompt': 'b'}
+    report = HtmlEvalReport()
+    buffer = io.StringIO()
+    report.generate_report_to(buffer, results, metadata)
+    assert buffer.getvalue() == report.generate_report(results, metadata)
+    assert '<strong>input</strong>' in buffer.getvalue()
+
+@pytest.mark.parametrize("text", [
+    "plain answer", "What is 2+2?", "Answer: 4", "3.14 is pi", "  padded ", "",
+    "**bold**", "1. item", "- item", "a < b", "line one\nline two", "    code",
+    "x\r- item", "foo\r", "a\x02b", "a\x03b", "---", "----",
+])
+def test_plain_text_fast_path_matches_markdown(text):
+    """Test that plain single lines skip the parser without changing the HTML."""
+    md = markdown.Markdown(extensions=['tables', 'fenced_code'], output_format="html")
+    assert _markdown_to_html(text) == md.convert(text)
+
 def test_show_status(qtbot, evaluation_widget):
     """Test showing status messages."""
     # Create simple mock window
@@ -1,6 +1,6 @@
 import pytest
 from PySide6.QtCore import Qt, Signal, QObject
-from PySide6.QtWidgets import QApplication, QPushButton, QMessageBox, QProgressDialog
+from PySide6.QtWidgets import QApplication, QPushButton, QMessageBox, QProgressDialog, QDialog
 from datetime import datetime
 import sys
 from pathlib import Path
@@ -12,6 +12,7 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from src.modules.llm_playground.llm_playground import LLMPlaygroundWidget
+from src.modules.llm_playground.critique_config_dialog import CritiqueRefineConfigDialog
 from src.llm.llm_utils_adapter import LLMWorker
 from src.storage.models import Prompt, PromptType
 
@@ -98,6 +99,7 @@ def test_parameter_changes(qtbot, playground_widget):
 class MockRunner(QObject):
     """Mock runner for LLM async operations."""
     finished = Signal(str)
+    partial = Signal(str)
     error = Signal(str)
     cancelled = Signal()
     
@@ -315,6 +317,62 @@ def test_llm_error_handling(mock_llm_worker, playground_widget, qtbot):
     # Check error is displayed in output
     assert "Error: Test error message" in playground_widget.playground_output.toPlainText()
 
+@patch('src.modules.llm_playground.llm_playground.LLMWorker')
+def test_llm_partial_streams_into_output(mock_llm_worker, playground_widget, qtbot):
+    """Test that streamed chunks replace the previous output and are appended in order."""
+    mock_worker = MockRunner()
+    mock_worker._should_succeed = False  # Prevent automatic success response
+    mock_llm_worker.return_value = mock_worker
+    playground_widget.playground_output.setPlainText("Previous response")
+    playground_widget.user_prompt.setPlainText("Test prompt")
+
+    playground_widget.submit_prompt()
+    mock_worker.partial.emit("Hello")
+    mock_worker.partial.emit(", world")
+
+    assert playground_widget.playground_output.toPlainText() == "Hello, world"
+
+@patch('src.modules.llm_playground.llm_playground.CritiqueNRefineWorker')
+@patch('src.modules.llm_playground.llm_playground.CritiqueRefineConfigDialog')
+def test_critique_model_is_passed_to_the_worker(mock_dialog, mock_worker, playground_widget, qtbot):
+    """Test that the critique model picked in the dialog reaches the critique and refine worker."""
+    mock_dialog.return_value.exec.return_value = QDialog.Accepted
+    mock_dialog.return_value.get_iterations.return_value = 1
+    mock_dialog.return_value.get_critique_model.return_value = "cheap-model"
+    playground_widget.user_prompt.setPlainText("Test prompt")
+
+    playground_widget.critique_and_refine_prompt()
+
+    current_model = playground_widget.model_combo.currentText()
+    assert mock_dialog.call_args.kwargs["current_model"] == current_model
+    assert mock_worker.call_args.kwargs["model_name"] == current_model
+    assert mock_worker.call_args.kwargs["critique_model_name"] == "cheap-model"
+    mock_worker.return_value.run.assert_called_once()
+
+def test_critique_dialog_defaults_to_the_current_model(qtbot):
+    """Test that the critique model selector starts at the model selected in the playground."""
+    dialog = CritiqueRefineConfigDialog(models=["model-a", "model-b"], current_model="model-b")
+    qtbot.addWidget(dialog)
+
+    assert dialog.get_critique_model() == "model-b"
+    dialog.critique_model_combo.setCurrentText("model-a")
+    assert dialog.get_critique_model() == "model-a"
+
+@patch('src.modules.llm_playground.llm_playground.LLMWorker')
+def test_skip_response_cache(mock_llm_worker, playground_widget, qtbot):
+    """Test that the cache bypass checkbox is passed on to the LLM request."""
+    mock_worker = MockRunner()
+    mock_worker._should_succeed = False
+    mock_llm_worker.return_value = mock_worker
+    playground_widget.user_prompt.setPlainText("Test prompt")
+
+    playground_widget.submit_prompt()
+    assert mock_llm_worker.call_args.kwargs["no_cache"] is False
+
+    playground_widget.no_cache_checkbox.setChecked(True)
+    playground_widget.submit_prompt()
+    assert mock_llm_worker.call_args.kwargs["no_cache"] is True
+
 def test_save_as_new_prompt(playground_widget, qtbot):
     """Test the save as new prompt functionality."""
     # Set prompts
@@ -102,6 +102,8 @@ def test_load_prompts(qtbot, catalog_widget, mock_storage):
         mock_storage.save_prompt(prompt)
     
     # Reload prompts
+    emitted = []
+    catalog_widget.prompt_selected_for_eval.connect(lambda current, previous: emitted.append(current.text()))
     catalog_widget.load_prompts()
     
     # Check if prompts are in the list
@@ -110,6 +112,15 @@ def test_load_prompts(qtbot, catalog_widget, mock_storage):
     assert "Prompt 1" in items
     assert "Prompt 2" in items
 
+    # The first prompt is selected and announced exactly once
+    assert emitted == ["Prompt 1"]
+    assert catalog_widget.title_edit.text() == "Prompt 1"
+
+    # Reloading keeps the current prompt selected
+    catalog_widget.prompt_list.setCurrentRow(1)
+    catalog_widget.load_prompts()
+    assert catalog_widget.prompt_list.currentItem().text() == "Prompt 2"
+
 def test_filter_prompts(qtbot, catalog_widget, mock_storage):
     """Test the prompt filtering functionality."""
     # Create test prompts
@@ -141,7 +152,7 @@ def test_filter_prompts(qtbot, catalog_widget, mock_storage):
     
     # Test filtering
     qtbot.keyClicks(catalog_widget.search_box, "AI")
-    qtbot.wait(100)  # Give time for filter to apply
+    qtbot.wait(200)  # Give time for filter to apply
     
     # Count visible items
     visible_count = sum(1 for i in range(catalog_widget.prompt_list.count())
@@ -155,11 +166,39 @@ def test_filter_prompts(qtbot, catalog_widget, mock_storage):
     
     # Clear filter
     catalog_widget.search_box.clear()
-    qtbot.wait(100)  # Give time for filter to clear
+    qtbot.wait(200)  # Give time for filter to clear
     visible_count = sum(1 for i in range(catalog_widget.prompt_list.count())
                        if not catalog_widget.prompt_list.item(i).isHidden())
     assert visible_count == 2
 
+def test_filter_prompts_incremental(qtbot, catalog_widget, mock_storage):
+    """Test narrowing, widening and unrelated searches give the same result as a full scan."""
+    for i, title in enumerate(["Code Review", "Cooking", "Translate"]):
+        mock_storage.save_prompt(Prompt(
+            title=title,
+            user_prompt="Test",
+            system_prompt=None,
+            prompt_type=PromptType.SIMPLE,
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+            id=f"test{i}"
+        ))
+    catalog_widget.load_prompts()
+
+    def visible_titles():
+        return [catalog_widget.prompt_list.item(i).text()
+                for i in range(catalog_widget.prompt_list.count())
+                if not catalog_widget.prompt_list.item(i).isHidden()]
+
+    for text, expected in [("co", ["Code Review", "Cooking"]),
+                           ("cod", ["Code Review"]),
+                           ("c", ["Code Review", "Cooking"]),
+                           ("trans", ["Translate"]),
+                           ("", ["Code Review", "Cooking", "Translate"])]:
+        catalog_widget.search_box.setText(text)
+        catalog_widget.filter_prompts()
+        assert visible_titles() == expected
+
 def test_delete_prompt(qtbot, catalog_widget, mock_storage, monkeypatch):
     """Test deleting a prompt."""
     # Create and save a test prompt
@@ -178,14 +217,14 @@ def test_delete_prompt(qtbot, catalog_widget, mock_storage, monkeypatch):
     # Select the prompt
     catalog_widget.prompt_list.setCurrentRow(0)
     
-    # Mock QMessageBox to always return Yes
-    def mock_question(*args, **kwargs):
-        return QMessageBox.Yes
-    monkeypatch.setattr(QMessageBox, 'question', mock_question)
-    
     # Simulate right-click and delete action
     current_item = catalog_widget.prompt_list.currentItem()
     catalog_widget.delete_prompt(current_item)
+
+    # Nothing is deleted until the confirmation is answered
+    assert len(mock_storage.prompts) == 1
+    box = catalog_widget.findChild(QMessageBox)
+    box.button(QMessageBox.Yes).click()
     
     # Verify prompt was deleted
     assert catalog_widget.prompt_list.count() == 0
@@ -207,3 +246,45 @@ def test_system_prompt_visibility(qtbot, catalog_widget):
     qtbot.mouseClick(catalog_widget.system_prompt_checkbox, Qt.LeftButton)
     qtbot.wait(100)  # Give time for visibility change
     assert catalog_widget.system_prompt.isVisible() == initial_visibility
+
+def test_save_prompt_updates_row_in_place(qtbot, catalog_widget, mock_storage, monkeypatch):
+    """Test that saving an edited prompt updates its row without reloading the catalog."""
+    for i, title in enumerate(["Alpha", "Gamma"]):
+        mock_storage.save_prompt(Prompt(
+            title=title,
+            user_prompt=f"Test {i}",
+            system_prompt=None,
+            prompt_type=PromptType.SIMPLE,
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+            id=f"test{i}"
+        ))
+    catalog_widget.load_prompts()
+    catalog_widget.prompt_list.setCurrentRow(0)
+
+    # Any further storage reads would indicate a full reload
+    monkeypatch.setattr(mock_storage, 'get_all_prompts', lambda: pytest.fail("catalog was reloaded"))
+
+    emitted = []
+    catalog_widget.prompt_selected_for_eval.connect(lambda current, previous: emitted.append(current.text()))
+
+    catalog_widget.title_edit.setText("Zeta")
+    catalog_widget.save_prompt()
+
+    # The moved row is selected, but the playground is told about it only once
+    assert emitted == ["Zeta"]
+
+    items = [catalog_widget.prompt_list.item(i).text() for i in range(catalog_widget.prompt_list.count())]
+    assert items == ["Gamma", "Zeta"]
+    assert catalog_widget.prompt_list.currentItem().text() == "Zeta"
+    assert catalog_widget.current_prompt.title == "Zeta"
+    assert mock_storage.prompts["test0"].title == "Zeta"
+
+    # Saving again without a title change keeps the row and refreshes its prompt
+    catalog_widget.user_prompt.setPlainText("Edited")
+    catalog_widget.save_prompt()
+
+    assert catalog_widget.prompt_list.currentRow() == 1
+    assert catalog_widget.prompt_list.count() == 2
+    assert catalog_widget._prompts[1].user_prompt == "Edited"
+    assert emitted == ["Zeta", "Zeta"]
@@ -0,0 +1,151 @@
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from PySide6.QtCore import QObject, Signal
+
+# Add the project root directory to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.modules.llm_playground import critique_n_refine
+from src.modules.llm_playground.critique_n_refine import CritiqueNRefineWorker
+
+class FakeLLMWorker(QObject):
+    """LLMWorker stand-in that answers each request with the next scripted response."""
+    finished = Signal(str)
+    partial = Signal(str)
+    error = Signal(str)
+    cancelled = Signal()
+
+    responses = []
+    requests = []
+
+    def __init__(self, model_name, user_prompt, system_prompt=None, model_params=None,
+                 cache_key=None, no_cache=False):
+        super().__init__()
+        self.model_name = model_name
+        self.user_prompt = user_prompt
+        self.system_prompt = system_prompt
+        self.cache_key = cache_key
+        self.no_cache = no_cache
+
+    def run(self):
+        FakeLLMWorker.requests.append(self)
+        response = FakeLLMWorker.responses.pop(0)
+        self.partial.emit(response)
+        self.finished.emit(response)
+
+class TestCritiqueNRefineWorker(unittest.TestCase):
+    def setUp(self):
+        FakeLLMWorker.responses = []
+        FakeLLMWorker.requests = []
+        patcher = patch.object(critique_n_refine, "LLMWorker", FakeLLMWorker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_worker(self, user_prompt="Write a poem.", **kwargs):
+        worker = CritiqueNRefineWorker(model_name="model", user_prompt=user_prompt, **kwargs)
+        results, errors = [], []
+        worker.finished.connect(results.append)
+        worker.error.connect(errors.append)
+        worker.run()
+        self.assertEqual(errors, [])
+        return results
+
+    def test_one_request_per_iteration(self):
+        FakeLLMWorker.responses = [
+            "<critique>Too vague.</critique>\n<refined_prompt>Write a sonnet.</refined_prompt>",
+            "<critique>Say about what.</critique>\n<refined_prompt>Write a sonnet about rain.</refined_prompt>",
+        ]
+        results = self.run_worker(iterations=2)
+
+        self.assertEqual(len(FakeLLMWorker.requests), 2)
+        self.assertIn("Write a sonnet.", FakeLLMWorker.requests[1].user_prompt)
+        self.assertIn("Say about what.", results[0])
+        self.assertTrue(results[0].endswith("Write a sonnet about rain."))
+
+    def test_stops_early_when_the_prompt_converges(self):
+        FakeLLMWorker.responses = [
+            "<critique>Too vague.</critique>\n<refined_prompt>Write a sonnet about the first rain of autumn.</refined_prompt>",
+            "<critique>Fine.</critique>\n<refined_prompt>Write a sonnet about the first rain of autumn!</refined_prompt>",
+        ]
+        results = self.run_worker(iterations=3)
+
+        self.assertEqual(len(FakeLLMWorker.requests), 2)
+        self.assertTrue(results[0].endswith("Write a sonnet about the first rain of autumn!"))
+
+    def test_streamed_chunks_are_emitted_as_tokens(self):
+        response = "<critique>Too vague.</critique>\n<refined_prompt>Write a sonnet.</refined_prompt>"
+        FakeLLMWorker.responses = [response]
+        worker = CritiqueNRefineWorker(model_name="model", user_prompt="Write a poem.", no_cache=True)
+        tokens = []
+        worker.token.connect(tokens.append)
+        worker.run()
+
+        self.assertEqual(tokens, [response])
+
+    def test_unformatted_response_falls_back_to_a_refine_request(self):
+        FakeLLMWorker.responses = ["Just a critique.", "Write a haiku."]
+        results = self.run_worker()
+
+        self.assertEqual(len(FakeLLMWorker.requests), 2)
+        self.assertIn("Just a critique.", FakeLLMWorker.requests[1].user_prompt)
+        self.assertTrue(results[0].endswith("Write a haiku."))
+
+    def test_repeated_runs_share_a_cache_key(self):
+        response = "<critique>Too vague.</critique>\n<refined_prompt>Write a sonnet.</refined_prompt>"
+        FakeLLMWorker.responses = [response, response]
+        self.run_worker(model_params={"temperature": 0})
+        self.run_worker(model_params={"temperature": 0})
+
+        first, second = FakeLLMWorker.requests
+        self.assertIsNotNone(first.cache_key)
+        self.assertEqual(first.cache_key, second.cache_key)
+
+    def test_whitespace_variants_share_a_cache_key(self):
+        response = "<critique>Too vague.</critique>\n<refined_prompt>Write a sonnet.</refined_prompt>"
+        FakeLLMWorker.responses = [response, response]
+        self.run_worker(user_prompt="Write a poem.\n- short")
+        self.run_worker(user_prompt="Write  a\tpoem. \n- short  \n")
+
+        first, second = FakeLLMWorker.requests
+        self.assertEqual(first.cache_key, second.cache_key)
+
+    def test_layout_is_part_of_the_cache_key(self):
+        response = "<critique>Too vague.</critique>\n<refined_prompt>Write a sonnet.</refined_prompt>"
+        FakeLLMWorker.responses = [response] * 3
+        self.run_worker(user_prompt="Write a poem.\n- short")
+        self.run_worker(user_prompt="Write a poem. - short")
+        self.run_worker(user_prompt="Write a poem.\n    - short")
+
+        keys = {request.cache_key for request in FakeLLMWorker.requests}
+        self.assertEqual(len(keys), 3)
+
+    def test_no_cache_is_passed_to_the_requests(self):
+        FakeLLMWorker.responses = ["<critique>Too vague.</critique>\n<refined_prompt>Write a sonnet.</refined_prompt>"]
+        self.run_worker(no_cache=True)
+
+        request = FakeLLMWorker.requests[0]
+        self.assertTrue(request.no_cache)
+        self.assertIsNone(request.cache_key)
+
+    def test_critique_model_critiques_and_main_model_refines(self):
+        FakeLLMWorker.responses = ["Too vague.", "Write a sonnet."]
+        results = self.run_worker(critique_model_name="cheap-model")
+
+        self.assertEqual([r.model_name for r in FakeLLMWorker.requests], ["cheap-model", "model"])
+        self.assertIn("Too vague.", FakeLLMWorker.requests[1].user_prompt)
+        self.assertIn("Too vague.", results[0])
+        self.assertTrue(results[0].endswith("Write a sonnet."))
+
+    def test_same_critique_model_uses_the_combined_request(self):
+        FakeLLMWorker.responses = ["<critique>Too vague.</critique>\n<refined_prompt>Write a sonnet.</refined_prompt>"]
+        self.run_worker(critique_model_name="model")
+
+        self.assertEqual(len(FakeLLMWorker.requests), 1)
+
+if __name__ == '__main__':
+    unittest.main()
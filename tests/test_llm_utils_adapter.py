@@ -0,0 +1,262 @@
+import unittest
+import sys
+import tempfile
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+import numpy as np
+
+# Add the project root directory to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.llm import llm_utils_adapter
+from src.llm.llm_utils_adapter import LLMWorker, LLMRunnable, EmbedBatchRunnable, EmbedBatcher, _to_embedding, _single_flight
+from src.llm.response_cache import ResponseCache, make_key
+from src.config import config
+from src.utils.thread_manager import ThreadManager
+
+class TestGetModels(unittest.TestCase):
+    def setUp(self):
+        # Let background model prefetches from other tests finish first
+        ThreadManager.instance().wait_for_all()
+        LLMWorker.invalidate_models_cache()
+        self.backend = MagicMock()
+        self.backend.get_models.return_value = ["model-a", "model-b"]
+        patcher = patch.object(llm_utils_adapter, "_get_backend", return_value=self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(LLMWorker.invalidate_models_cache)
+
+    def test_get_models_is_cached(self):
+        self.assertEqual(LLMWorker.get_models(), ("model-a", "model-b"))
+        self.assertIs(LLMWorker.get_models(), LLMWorker.get_models())
+        self.backend.get_models.assert_called_once()
+
+    def test_get_models_refetches_after_ttl(self):
+        LLMWorker.get_models()
+        with patch.object(llm_utils_adapter.time, "monotonic",
+                          return_value=llm_utils_adapter.time.monotonic() + llm_utils_adapter._MODELS_CACHE_TTL + 1):
+            LLMWorker.get_models()
+        self.assertEqual(self.backend.get_models.call_count, 2)
+
+    def test_warm_up_fills_the_cache(self):
+        LLMWorker.warm_up()
+        ThreadManager.instance().wait_for_all()
+        LLMWorker.get_models()
+        self.backend.get_models.assert_called_once()
+
+    def test_invalidate_models_cache(self):
+        LLMWorker.get_models()
+        LLMWorker.invalidate_models_cache()
+        LLMWorker.get_models()
+        self.assertEqual(self.backend.get_models.call_count, 2)
+
+class TestLLMRunnableStreaming(unittest.TestCase):
+    def setUp(self):
+        self.backend = MagicMock()
+        for patcher in (patch.object(llm_utils_adapter, "_get_backend", return_value=self.backend),
+                        patch.object(config, "_llm_api", "litellm"),
+                        patch.object(config, "_enable_streaming", True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _run(self, runnable):
+        emitted = {"partial": [], "finished": [], "cancelled": []}
+        runnable.signals.partial.connect(emitted["partial"].append)
+        runnable.signals.finished.connect(emitted["finished"].append)
+        runnable.signals.cancelled.connect(lambda: emitted["cancelled"].append(True))
+        runnable.run()
+        return emitted
+
+    def test_chunks_are_emitted_before_the_result(self):
+        def stream(*args, on_chunk, is_cancelled):
+            on_chunk("Hel")
+            on_chunk("lo")
+            return "Hello"
+        self.backend.run_llm_stream.side_effect = stream
+
+        emitted = self._run(LLMRunnable("model", "prompt"))
+
+        self.assertEqual(emitted["partial"], ["Hel", "lo"])
+        self.assertEqual(emitted["finished"], ["Hello"])
+        self.backend.run_llm.assert_not_called()
+
+    def test_cancelled_stream_emits_cancelled(self):
+        self.backend.run_llm_stream.return_value = None
+
+        emitted = self._run(LLMRunnable("model", "prompt"))
+
+        self.assertEqual(emitted["finished"], [])
+        self.assertEqual(emitted["cancelled"], [True])
+
+class TestLLMRunnableCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.cache = ResponseCache(Path(self.temp_dir) / "responses.sqlite3")
+        self.backend = MagicMock()
+        self.backend.run_llm.return_value = "fresh"
+        for patcher in (patch.object(llm_utils_adapter, "response_cache", self.cache),
+                        patch.object(llm_utils_adapter, "_get_backend", return_value=self.backend),
+                        patch.object(config, "_enable_streaming", False)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _run(self, runnable):
+        finished = []
+        runnable.signals.finished.connect(finished.append)
+        runnable.run()
+        return finished
+
+    def test_deterministic_request_uses_the_given_cache_key(self):
+        self.cache.put("custom-key", "cached")
+        finished = self._run(LLMRunnable("model", "prompt", model_params={"temperature": 0}, cache_key="custom-key"))
+
+        self.assertEqual(finished, ["cached"])
+        self.backend.run_llm.assert_not_called()
+
+    def test_sampled_request_skips_the_cache(self):
+        self.cache.put("custom-key", "cached")
+        finished = self._run(LLMRunnable("model", "prompt", model_params={"temperature": 0.7}, cache_key="custom-key"))
+
+        self.assertEqual(finished, ["fresh"])
+        self.assertEqual(self.cache.get("custom-key"), "cached")
+
+    def test_no_cache_skips_the_cache(self):
+        self.cache.put("custom-key", "cached")
+        finished = self._run(LLMRunnable("model", "prompt", model_params={"temperature": 0},
+                                         cache_key="custom-key", no_cache=True))
+
+        self.assertEqual(finished, ["fresh"])
+
+    def test_expired_entry_is_not_used(self):
+        with patch("src.llm.response_cache.time.time", return_value=1000.0):
+            self.cache.put("custom-key", "stale")
+        with patch.object(config, "_llm_cache_ttl", 3600), \
+             patch("src.llm.response_cache.time.time", return_value=1000.0 + 7200):
+            finished = self._run(LLMRunnable("model", "prompt", model_params={"temperature": 0}, cache_key="custom-key"))
+
+        self.assertEqual(finished, ["fresh"])
+
+    def test_fresh_result_is_stored_under_the_given_cache_key(self):
+        self._run(LLMRunnable("model", "prompt", model_params={"temperature": 0}, cache_key="custom-key"))
+
+        self.assertEqual(self.cache.get("custom-key"), "fresh")
+
+class TestEmbedBatchRunnable(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.cache = ResponseCache(Path(self.temp_dir) / "responses.sqlite3")
+        self.backend = MagicMock()
+        patchers = [patch.object(llm_utils_adapter, "response_cache", self.cache),
+                    patch.object(llm_utils_adapter, "_get_backend", return_value=self.backend)]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_only_cache_misses_are_embedded_in_one_batch(self):
+        runnable = EmbedBatchRunnable(["cached", "first", "second"])
+        embed_model = runnable.llm_cmd_embed_model if config.llm_api == "llm-cmd" else runnable.litellm_embed_model
+        self.cache.put_vector(make_key(kind="embed", api=config.llm_api, model=embed_model, text="cached"), [0.0])
+        self.backend.run_embed_batch.return_value = [[1.0], [2.0]]
+
+        results = []
+        runnable.signals.finished.connect(results.append)
+        runnable.run()
+
+        self.backend.run_embed_batch.assert_called_once_with(embed_model, ["first", "second"])
+        self.assertEqual([r.tolist() for r in results[0]], [[0.0], [1.0], [2.0]])
+        self.assertTrue(all(r.dtype == np.float32 for r in results[0]))
+        # Fresh results are cached for the next request
+        self.assertEqual(self.cache.get_vector(
+            make_key(kind="embed", api=config.llm_api, model=embed_model, text="first")).tolist(), [1.0])
+
+    def test_whitespace_variants_share_a_cache_entry(self):
+        runnable = EmbedBatchRunnable(["  hello \n\n world\t"])
+        embed_model = runnable.llm_cmd_embed_model if config.llm_api == "llm-cmd" else runnable.litellm_embed_model
+        self.cache.put_vector(make_key(kind="embed", api=config.llm_api, model=embed_model, text="hello world"), [3.0])
+
+        results = []
+        runnable.signals.finished.connect(results.append)
+        runnable.run()
+
+        self.backend.run_embed_batch.assert_not_called()
+        self.assertEqual(results[0][0].tolist(), [3.0])
+
+    def test_no_cache_skips_the_cache(self):
+        runnable = EmbedBatchRunnable(["secret"], no_cache=True)
+        embed_model = runnable.llm_cmd_embed_model if config.llm_api == "llm-cmd" else runnable.litellm_embed_model
+        key = make_key(kind="embed", api=config.llm_api, model=embed_model, text="secret")
+        self.cache.put_vector(key, [9.0])
+        self.backend.run_embed_batch.return_value = [[1.0]]
+
+        results = []
+        runnable.signals.finished.connect(results.append)
+        runnable.run()
+
+        self.assertEqual(results[0][0].tolist(), [1.0])
+        self.assertEqual(self.cache.get_vector(key).tolist(), [9.0])
+
+    def test_to_embedding(self):
+        embedding = _to_embedding([0.5, -1.0, 2.0])
+        self.assertEqual(embedding.dtype, np.float32)
+        self.assertEqual(embedding.shape, (3,))
+        np.testing.assert_array_equal(embedding, [0.5, -1.0, 2.0])
+
+class TestEmbedBatcher(unittest.TestCase):
+    def setUp(self):
+        self.backend = MagicMock()
+        self.backend.run_embed_batch.side_effect = lambda model, texts: [[float(len(t))] for t in texts]
+        patcher = patch.object(llm_utils_adapter, "_get_backend", return_value=self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.batcher = EmbedBatcher()
+
+    def test_concurrent_submits_share_one_request(self):
+        futures = [self.batcher.submit("model", text) for text in ("a", "bb", "ccc")]
+        self.assertEqual([f.result(timeout=5) for f in futures], [[1.0], [2.0], [3.0]])
+        self.backend.run_embed_batch.assert_called_once_with("model", ["a", "bb", "ccc"])
+
+    def test_full_batch_is_sent_immediately(self):
+        with patch.object(config, "_embed_batch_size", 2), \
+             patch.object(EmbedBatcher, "FLUSH_DELAY", 60):
+            futures = [self.batcher.submit("model", text) for text in ("a", "bb")]
+            self.assertTrue(all(f.done() for f in futures))
+
+    def test_backend_error_fails_every_future(self):
+        self.backend.run_embed_batch.side_effect = RuntimeError("boom")
+        futures = [self.batcher.submit("model", text) for text in ("a", "b")]
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=5)
+
+class TestSingleFlight(unittest.TestCase):
+    def test_request_waits_for_identical_inflight_request(self):
+        inflight = Future()
+        compute = MagicMock(return_value="own result")
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        with patch.dict(llm_utils_adapter._inflight, {"key": inflight}):
+            follower = executor.submit(_single_flight, "key", compute)
+            inflight.set_result("shared result")
+            self.assertEqual(follower.result(timeout=5), ("shared result", True))
+        compute.assert_not_called()
+
+    def test_owner_computes_and_releases_key(self):
+        self.assertEqual(_single_flight("key", lambda: "result"), ("result", False))
+        self.assertNotIn("key", llm_utils_adapter._inflight)
+
+    def test_error_is_raised_and_key_released(self):
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            _single_flight("key", fail)
+        self.assertEqual(_single_flight("key", lambda: "ok"), ("ok", False))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+# Add the project root directory to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.llm import llm_utils_llmcmd
+from src.llm.llm_errors import LLMError, LLMQuotaError, LLMCapabilityError, LLMConnectionError
+
+class TestRunLLMInProcess(unittest.TestCase):
+    def setUp(self):
+        self.llm_lib = MagicMock()
+        self.model = self.llm_lib.get_model.return_value
+        self.model.prompt.return_value.text.return_value = " answer \n"
+        for patcher in (patch.object(llm_utils_llmcmd, "llm_lib", self.llm_lib),
+                        patch.dict(llm_utils_llmcmd._llm_models, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_run_llm_uses_the_llm_package(self):
+        with patch.object(llm_utils_llmcmd.subprocess, "Popen") as mock_popen:
+            result = llm_utils_llmcmd.run_llm("gpt-4.1", "hello", "be brief",
+                                              {"temperature": 0.5, "top_p": None})
+        self.assertEqual(result, "answer")
+        self.model.prompt.assert_called_once_with("hello", system="be brief", temperature=0.5)
+        mock_popen.assert_not_called()
+
+    def test_models_are_resolved_once(self):
+        llm_utils_llmcmd.run_llm("gpt-4.1", "one")
+        llm_utils_llmcmd.run_llm("gpt-4.1", "two")
+        self.llm_lib.get_model.assert_called_once_with("gpt-4.1")
+
+    def test_errors_are_classified(self):
+        self.model.prompt.side_effect = RuntimeError("Resource has been exhausted (e.g. check quota).")
+        with self.assertRaises(LLMQuotaError):
+            llm_utils_llmcmd.run_llm("gpt-4.1", "hello")
+        self.model.prompt.side_effect = RuntimeError("Connection reset by peer")
+        with self.assertRaises(LLMConnectionError):
+            llm_utils_llmcmd.run_llm("gpt-4.1", "hello")
+        self.model.prompt.side_effect = RuntimeError("Something else")
+        with self.assertRaises(LLMError):
+            llm_utils_llmcmd.run_llm("gpt-4.1", "hello")
+
+class TestRunEmbedInProcess(unittest.TestCase):
+    def setUp(self):
+        self.llm_lib = MagicMock()
+        self.embed_model = self.llm_lib.get_embedding_model.return_value
+        for patcher in (patch.object(llm_utils_llmcmd, "llm_lib", self.llm_lib),
+                        patch.dict(llm_utils_llmcmd._embed_models, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_run_embed_uses_the_llm_package(self):
+        self.embed_model.embed.return_value = (0.5, -1.0)
+        with patch.object(llm_utils_llmcmd.subprocess, "Popen") as mock_popen:
+            self.assertEqual(llm_utils_llmcmd.run_embed("3-large", "it's"), [0.5, -1.0])
+        self.embed_model.embed.assert_called_once_with("it's")
+        mock_popen.assert_not_called()
+
+    def test_run_embed_batch_uses_embed_multi(self):
+        self.embed_model.embed_multi.return_value = iter([(1.0,), (2.0,)])
+        self.assertEqual(llm_utils_llmcmd.run_embed_batch("3-large", ["a", "b"]), [[1.0], [2.0]])
+        self.llm_lib.get_embedding_model.assert_called_once_with("3-large")
+
+class TestRunWithCLI(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(llm_utils_llmcmd, "llm_lib", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_run_llm_pipes_the_prompt(self):
+        with patch.object(llm_utils_llmcmd.subprocess, "run") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stdout=" answer\n", stderr="")
+            self.assertEqual(llm_utils_llmcmd.run_llm("gpt-4.1", "it's a prompt"), "answer")
+        self.assertEqual(mock_run.call_args.kwargs["input"], "it's a prompt")
+
+    def test_run_embed_pipes_the_text(self):
+        with patch.object(llm_utils_llmcmd.subprocess, "run") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stdout="[0.5, -1.0]\n", stderr="")
+            self.assertEqual(llm_utils_llmcmd.run_embed("3-large", "it's \\ text"), [0.5, -1.0])
+        cmd = mock_run.call_args.args[0]
+        self.assertEqual(cmd, ["llm", "embed", "-m", "3-large", "-i", "-"])
+        self.assertEqual(mock_run.call_args.kwargs["input"], "it's \\ text")
+
+    def test_build_llm_command(self):
+        cmd = llm_utils_llmcmd._build_llm_command("gpt-4.1", "Don't 'quote' me",
+                                                 {"temperature": 0.5, "max_tokens": None})
+        self.assertEqual(cmd, ["llm", "-m", "gpt-4.1", "-o", "temperature", "0.5", "-s", "Don't 'quote' me"])
+        # Callers get their own list, so changing it can't affect the cached command
+        cmd.append("extra")
+        self.assertNotIn("extra", llm_utils_llmcmd._build_llm_command("gpt-4.1", "Don't 'quote' me",
+                                                                       {"temperature": 0.5}))
+
+    def test_run_llm_classifies_cli_errors(self):
+        with patch.object(llm_utils_llmcmd.subprocess, "run") as mock_run:
+            mock_run.return_value = MagicMock(returncode=1, stdout="", stderr="Network unreachable\n")
+            with self.assertRaises(LLMConnectionError):
+                llm_utils_llmcmd.run_llm("gpt-4.1", "hello")
+
+class TestClassifyError(unittest.TestCase):
+    def test_quota_takes_precedence_over_connection_errors(self):
+        error = llm_utils_llmcmd._classify_error("m", "Timeout after retry: Resource has been exhausted")
+        self.assertIsInstance(error, LLMQuotaError)
+
+    def test_system_prompt_capability(self):
+        error = llm_utils_llmcmd._classify_error("m", "Error: Model does not support system prompts")
+        self.assertIsInstance(error, LLMCapabilityError)
+        self.assertIn("'m'", str(error))
+
+    def test_connection_terms_ignore_case(self):
+        error = llm_utils_llmcmd._classify_error("m", "NETWORK unreachable")
+        self.assertIsInstance(error, LLMConnectionError)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,7 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from src.main_window import MainWindow
+from src.storage.storage import FileStorage
 from src.storage.models import Prompt, PromptType
 
 @pytest.fixture
@@ -73,3 +74,35 @@ def test_prompt_selected_for_eval(main_window, qtbot):
     with patch.object(main_window.llm_playground, 'set_prompt') as mock_set_prompt:
         main_window.on_prompt_selected_for_eval(mock_item, None)
         mock_set_prompt.assert_called_once_with(test_prompt)
+
+
+def test_tabs_are_built_on_first_show(main_window):
+    """Test that only the visible tab is built until another tab is shown."""
+    assert set(main_window._tab_widgets) == {0}
+
+    main_window.tabs.setCurrentIndex(3)
+    assert main_window.tabs.widget(3) is main_window._tab_widgets[3]
+    assert main_window.tabs.currentIndex() == 3
+    assert main_window.tabs.tabText(3) == "📊 Test Evaluation"
+
+def test_startup_with_saved_prompts(qtbot, qapp, tmp_path):
+    """Test that a window over stored prompts builds one catalog and hands the
+    selected prompt to the playground once that tab is shown."""
+    prompt_storage = FileStorage(str(tmp_path / "prompts"))
+    prompt_storage.save_prompt(Prompt(
+        title="Saved Prompt",
+        user_prompt="Saved content",
+        system_prompt=None,
+        prompt_type=PromptType.SIMPLE,
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+        id="saved"
+    ))
+    window = MainWindow(prompt_storage, MagicMock())
+    qtbot.addWidget(window)
+
+    assert set(window._tab_widgets) == {0}
+    assert [p.title for p in window.prompts_catalog._prompts] == ["Saved Prompt"]
+
+    window.tabs.setCurrentIndex(1)
+    assert window.llm_playground.user_prompt.toPlainText() == "Saved content"
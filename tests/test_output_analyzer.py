@@ -11,7 +11,7 @@ project_root = str(Path(__file__).parent.parent)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from src.modules.eval_playground.output_analyzer import OutputAnalyzer, AnalysisResult, AnalysisError, LLMError, SimilarityError, AsyncAnalyzer
+from src.modules.eval_playground.output_analyzer import OutputAnalyzer, AnalysisResult, AnalysisError, LLMError, SimilarityError, AsyncAnalyzer, _unit_vector
 
 class TestOutputAnalyzer(unittest.IsolatedAsyncioTestCase):
     @classmethod
@@ -51,6 +51,41 @@ class TestOutputAnalyzer(unittest.IsolatedAsyncioTestCase):
         self.assertIsNone(async_analyzer.grade)
         self.assertIsNone(async_analyzer.feedback)
 
+    def test_identical_outputs_skip_embeddings(self):
+        async_analyzer = self.analyzer.create_async_analyzer()
+        with patch.object(async_analyzer, '_get_embeddings_async') as mock_embed, \
+             patch.object(async_analyzer, '_get_llm_grade') as mock_grade:
+            async_analyzer.start_analysis("input", "same output", "same output")
+        mock_embed.assert_not_called()
+        mock_grade.assert_called_once_with(1.0)
+
+    def test_handle_text_grade_result(self):
+        async_analyzer = self.analyzer.create_async_analyzer()
+        async_analyzer.input_text = "input"
+        async_analyzer.baseline = "baseline"
+        async_analyzer.current = "current"
+        results = []
+        async_analyzer.finished.connect(results.append)
+
+        async_analyzer._handle_grade_result("Grade: +1\n---\nClearer answer.\nMore detail.", 0.9)
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].llm_grade, "👍")
+        self.assertEqual(results[0].llm_feedback, "Clearer answer.\nMore detail.")
+
+    def test_handle_json_grade_result(self):
+        async_analyzer = self.analyzer.create_async_analyzer()
+        async_analyzer.input_text = "input"
+        async_analyzer.baseline = "baseline"
+        async_analyzer.current = "current"
+        results = []
+        async_analyzer.finished.connect(results.append)
+
+        async_analyzer._handle_grade_result('{"grade": 2, "feedback": "Much better."}', 0.8)
+        async_analyzer._handle_grade_result('{"grade": "+3", "feedback": "Off scale."}', 0.8)
+
+        self.assertEqual([r.llm_grade for r in results], ["👍👍", "+3 (invalid)"])
+
     def test_get_analysis_text(self):
         # Test with valid result from setup
         expected_text = """Semantic Similarity Analysis:
@@ -92,5 +127,37 @@ Note: Using overall semantic similarity for comparison"""
         # Verify history is empty
         self.assertEqual(len(self.analyzer.analysis_results), 0)
 
+    def test_unit_vector_dot_is_cosine_similarity(self):
+        a = _unit_vector(np.array([[1.0, 2.0, 3.0]]))
+        b = _unit_vector(np.array([2.0, 4.0, 6.0]))
+        c = _unit_vector(np.array([-3.0, 0.0, 1.0]))
+        self.assertEqual(a.shape, (3,))
+        self.assertAlmostEqual(float(a @ b), 1.0, places=6)
+        self.assertAlmostEqual(float(a @ c), 0.0, places=6)
+        self.assertEqual(float(a @ _unit_vector(np.zeros(3))), 0.0)
+
+    def test_handle_embeddings_computes_similarity(self):
+        async_analyzer = self.analyzer.create_async_analyzer()
+        async_analyzer.baseline = "baseline"
+        async_analyzer.current = "current"
+        with patch.object(async_analyzer, '_get_llm_grade') as mock_grade:
+            async_analyzer._handle_embeddings([np.array([3.0, 4.0], dtype=np.float32),
+                                               np.array([4.0, 3.0], dtype=np.float32)])
+        self.assertAlmostEqual(mock_grade.call_args.args[0], 0.96, places=5)
+
+    def test_repeated_texts_skip_the_embed_worker(self):
+        first = self.analyzer.create_async_analyzer()
+        first.baseline, first.current = "memo baseline", "memo current"
+        with patch.object(first, '_get_llm_grade'):
+            first._handle_embeddings([np.array([1.0, 0.0]), np.array([0.0, 1.0])])
+
+        second = self.analyzer.create_async_analyzer()
+        second.baseline, second.current = "memo baseline", "memo current"
+        with patch('src.modules.eval_playground.output_analyzer.BatchEmbedWorker') as mock_worker, \
+             patch.object(second, '_get_llm_grade') as mock_grade:
+            second._get_embeddings_async()
+        mock_worker.assert_not_called()
+        self.assertAlmostEqual(mock_grade.call_args.args[0], 0.0, places=6)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,80 @@
+import unittest
+import sys
+import tempfile
+import shutil
+import sqlite3
+from pathlib import Path
+from unittest.mock import patch
+import numpy as np
+
+# Add the project root directory to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.llm.response_cache import ResponseCache, make_key
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for the cache database
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = ResponseCache(Path(self.temp_dir) / "cache" / "responses.sqlite3")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_get_missing_key(self):
+        self.assertIsNone(self.cache.get(make_key(kind="llm", model="m", user_prompt="hi")))
+
+    def test_put_and_get(self):
+        key = make_key(kind="embed", model="3-large", text="hello")
+        self.cache.put(key, "[0.1, 0.2]")
+        self.assertEqual(self.cache.get(key), "[0.1, 0.2]")
+
+        # Entries survive reopening the database
+        reopened = ResponseCache(self.cache.path)
+        self.assertEqual(reopened.get(key), "[0.1, 0.2]")
+
+    def test_put_and_get_vector(self):
+        key = make_key(kind="embed", model="3-large", text="hello")
+        self.assertIsNone(self.cache.get_vector(key))
+        self.cache.put_vector(key, [0.5, -1.0, 2.0])
+        vector = self.cache.get_vector(key)
+        self.assertEqual(vector.dtype, np.float32)
+        self.assertEqual(vector.tolist(), [0.5, -1.0, 2.0])
+
+    def test_get_vector_max_age(self):
+        key = make_key(kind="embed", model="3-large", text="hello")
+        with patch("src.llm.response_cache.time.time", return_value=1000.0):
+            self.cache.put_vector(key, [1.0])
+        with patch("src.llm.response_cache.time.time", return_value=1100.0):
+            self.assertIsNotNone(self.cache.get_vector(key, max_age=200))
+            self.assertIsNone(self.cache.get_vector(key, max_age=50))
+
+    def test_get_max_age(self):
+        key = make_key(kind="llm", model="m", user_prompt="hi")
+        with patch("src.llm.response_cache.time.time", return_value=1000.0):
+            self.cache.put(key, "hello")
+        with patch("src.llm.response_cache.time.time", return_value=1100.0):
+            self.assertEqual(self.cache.get(key, max_age=200), "hello")
+            self.assertIsNone(self.cache.get(key, max_age=50))
+
+    def test_responses_from_an_older_cache_expire(self):
+        # Databases from before responses had a timestamp are migrated on open
+        self.cache.path.parent.mkdir(parents=True)
+        conn = sqlite3.connect(self.cache.path)
+        conn.execute("CREATE TABLE responses (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute("INSERT INTO responses (key, value) VALUES ('old', 'stale')")
+        conn.commit()
+        conn.close()
+
+        self.assertEqual(self.cache.get("old"), "stale")
+        self.assertIsNone(self.cache.get("old", max_age=3600))
+
+    def test_make_key(self):
+        key = make_key(model="m", params={"temperature": 0, "top_p": 1})
+        self.assertEqual(key, make_key(params={"top_p": 1, "temperature": 0}, model="m"))
+        self.assertNotEqual(key, make_key(model="m", params={"temperature": 0.5, "top_p": 1}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,7 @@ import tempfile
 import shutil
 from pathlib import Path
 from datetime import datetime
+from unittest.mock import patch
 
 # Add the project root directory to Python path
 project_root = str(Path(__file__).parent.parent)
@@ -83,6 +84,23 @@ class TestFileStorage(unittest.TestCase):
         self.assertIn("Test Prompt", titles)
         self.assertIn("Test Prompt 2", titles)
 
+    def test_get_all_prompts_cached_until_write(self):
+        self.storage.save_prompt(self.test_prompt)
+        self.assertEqual(len(self.storage.get_all_prompts()), 1)
+
+        # Repeat reads don't touch the files
+        with patch.object(Prompt, 'from_dict', side_effect=AssertionError("prompt files re-read")):
+            prompts = self.storage.get_all_prompts()
+        self.assertEqual([p.id for p in prompts], ["test1"])
+
+        # The returned list is a copy of the cache
+        prompts.clear()
+        self.assertEqual(len(self.storage.get_all_prompts()), 1)
+
+        # Writes invalidate the cache
+        self.storage.delete_prompt("test1", PromptType.SIMPLE)
+        self.assertEqual(self.storage.get_all_prompts(), [])
+
     def test_delete_prompt(self):
         # Save and then delete a prompt
         self.storage.save_prompt(self.test_prompt)